@@ -7,9 +7,6 @@ from typing import Dict, Any, Optional, List
 import unicodedata
 import re
 from app.ml.parsing import ASTParser
-from app.ml.code_smell_detector import CodeSmellDetector
-from app.services.code_quality_metrics import CodeQualityAnalyzer
-from app.ml.ml_complexity_predictor import ComplexityPredictor
 from app.services.technical_debt_calculator import TechnicalDebtCalculator, TechnicalDebtMetrics
 from app.ml.design_pattern_detector import DesignPatternDetector
 from app.services.nlp_explainer import generate_nlp_report
@@ -86,9 +83,13 @@ class FeatureRouter:
 
     def __init__(self):
         self.ast_parser = ASTParser()
-        self.smell_detector = CodeSmellDetector()
-        self.quality_analyzer = CodeQualityAnalyzer()
-        self.complexity_predictor = ComplexityPredictor()
+        # Share the parser's analyzers so both paths hit the same AST, smell
+        # and prediction caches
+        self.smell_detector = self.ast_parser.smell_detector
+        self.quality_analyzer = self.ast_parser.quality_analyzer
+        self.complexity_predictor = self.ast_parser.complexity_predictor
+        # Load the complexity model now rather than on the first request
+        self.complexity_predictor.load_model()
         self.debt_calculator = TechnicalDebtCalculator()
         self.design_pattern_detector = DesignPatternDetector()
         # Try to load pre-trained design pattern model
@@ -140,8 +141,10 @@ class FeatureRouter:
                 tmp.write(code_content)
                 tmp_path = tmp.name
 
+            # What reading the temp file back in text mode would give
+            normalized_content = code_content.replace("\r\n", "\n").replace("\r", "\n")
             try:
-                ast_result = self.ast_parser.parse_file(tmp_path)
+                ast_result = self.ast_parser.parse_file(tmp_path, code=normalized_content)
             finally:
                 if os.path.exists(tmp_path):
                     os.unlink(tmp_path)
@@ -151,18 +154,13 @@ class FeatureRouter:
         else:
             raise ValueError("Either file_path or code_content must be provided")
 
-        # Step 2: Extract features for ML model
-        ml_features = self.complexity_predictor.extract_features_from_code(code_content)
+        # Step 2: Extract features for ML model (prediction comes with them,
+        # cached per distinct source)
+        ml_result = self.complexity_predictor.predict_from_code(code_content)
+        ml_features = ml_result["features"]
 
         # Step 3: Route to code smell detection (AST-based)
-        language = ast_result.get("language", "Unknown")
-
-        if language == "Python":
-            smells = self.smell_detector.detect_python_smells(ast_result)
-        elif language == "Java":
-            smells = self.smell_detector.detect_java_smells(ast_result)
-        else:
-            smells = []
+        smells = self.smell_detector.detect_smells(ast_result)
 
         smell_summary = {
             "by_type": {},
@@ -192,19 +190,12 @@ class FeatureRouter:
         if file_path:
             quality_score = self.quality_analyzer.analyze_file(file_path, smell_summary)
         else:
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix=temp_file_suffix, encoding='utf-8') as tmp:
-                tmp.write(code_content)
-                tmp_path = tmp.name
-
-            try:
-                quality_score = self.quality_analyzer.analyze_file(tmp_path, smell_summary)
-            finally:
-                if os.path.exists(tmp_path):
-                    os.unlink(tmp_path)
+            quality_score = self.quality_analyzer.analyze_file(
+                "<code_content>", smell_summary, content=normalized_content,
+            )
 
         # Step 5: Route to ML complexity prediction
-        ml_prediction = self.complexity_predictor.predict_complexity(ml_features)
+        ml_prediction = ml_result["prediction"]
 
         # Step 6: Route to technical debt calculation
         debt_metrics = self.debt_calculator.calculate_debt(
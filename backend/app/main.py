@@ -238,7 +238,7 @@ async def design_pattern_pipeline_info():
 async def get_supported_extensions():
     """Get list of supported file extensions"""
     return {
-        "supported_extensions": FileHandler.SUPPORTED_EXTENSIONS,
+        "supported_extensions": sorted(FileHandler.SUPPORTED_EXTENSIONS),
         "languages": {
             ".py": "Python",
             ".java": "Java",
@@ -383,7 +383,7 @@ async def analyze_file_endpoint(
         if file_ext not in FileHandler.SUPPORTED_EXTENSIONS:
             raise HTTPException(
                 status_code=400,
-                detail=f"Unsupported file type: {file_ext}. Supported: {', '.join(FileHandler.SUPPORTED_EXTENSIONS)}"
+                detail=f"Unsupported file type: {file_ext}. Supported: {FileHandler.SUPPORTED_EXTS_STR}"
             )
           # Ensure stream starts at beginning (some clients / middleware may advance it)
         await file.seek(0)
@@ -574,7 +574,7 @@ async def analyze_file_with_explanation(
         if file_ext not in FileHandler.SUPPORTED_EXTENSIONS:
             raise HTTPException(
                 status_code=400,
-                detail=f"Unsupported file type: {file_ext}. Supported: {', '.join(FileHandler.SUPPORTED_EXTENSIONS)}"
+                detail=f"Unsupported file type: {file_ext}. Supported: {FileHandler.SUPPORTED_EXTS_STR}"
             )
 
         await file.seek(0)
@@ -1379,12 +1379,45 @@
 import ast
 import re
 import os
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+from collections import Counter, OrderedDict
 from dataclasses import dataclass
 import hashlib
 
+_BRACE_RE = re.compile(r'[{}]')
 
-@dataclass
+# Java detector patterns, compiled once rather than looked up in re's cache
+# on every call (several run once per source line)
+_JAVA_CLASS_NAME_RE = re.compile(r'class\s+(\w+)')
+_JAVA_CLASS_OPEN_RE = re.compile(r'class\s+\w+\s*\{')
+_JAVA_METHOD_DECL_RE = re.compile(r'(public|private|protected)\s+(static\s+)?(\w+(?:<[^>]+>)?)\s+(\w+)\s*\([^)]*\)\s*(?:throws\s+[\w,\s]+)?\s*\{')
+_JAVA_PARAMS_RE = re.compile(r'(public|private|protected)?\s*(static)?\s*\w+\s+\w+\s*\(([^)]*)\)')
+_JAVA_METHOD_BODY_RE = re.compile(r'(public|private|protected)?\s*(static)?\s*\w+\s+\w+\s*\([^)]*\)\s*\{')
+_JAVA_FIELD_RE = re.compile(r'(public|private|protected)?\s*(static)?\s*(final)?\s*\w+\s+\w+;')
+_JAVA_SIGNATURE_RE = re.compile(r'(public|private|protected)\s+\w+\s+\w+\s*\(')
+_JAVA_PRIMITIVE_SIGNATURE_RE = re.compile(r'(void|int|long|double|float|boolean|byte|short|char)\s+\w+\s*\(')
+_JAVA_PUBLIC_MEMBER_RE = re.compile(r'public\s+(?!static|final|class|interface|enum|void|abstract)')
+_JAVA_PUBLIC_FIELD_RE = re.compile(r'public\s+\w+\s+\w+\s*[;=]')
+_CACHE_SIZE = 128
+
+
+def _lru_get(cache, key):
+    """Look up key in an OrderedDict LRU, marking it most recently used"""
+    value = cache.get(key)
+    if value is not None:
+        cache.move_to_end(key)
+    return value
+
+
+def _lru_put(cache, key, value):
+    """Store key in an OrderedDict LRU, evicting the least recently used entry"""
+    cache[key] = value
+    cache.move_to_end(key)
+    if len(cache) > _CACHE_SIZE:
+        cache.popitem(last=False)
+
+
+@dataclass(slots=True, frozen=True)
 class CodeSmell:
     """Represents a detected code smell with its details"""
     smell_type: str
@@ -1402,26 +1435,33 @@ class CodeSmellDetector:
         self.file_path = ""
         self.lines = []
         self._content_cache = {}
-        self._ast_cache = {}
+        self._ast_cache = OrderedDict()
+        self._smell_cache = OrderedDict()
 
     # ─────────────────────────────────────────────
     # Public entry points (called by ast_parser.py)
     # ─────────────────────────────────────────────
 
-    def detect_python_smells(self, ast_data: dict) -> List[CodeSmell]:
-        """Detect Python smells from ast_data (must contain '_raw_source')"""
+    def detect_python_smells(self, ast_data: dict, tree: Optional[ast.AST] = None) -> List[CodeSmell]:
+        """Detect Python smells from ast_data (must contain '_raw_source');
+        tree is the caller's parse of that source, if it already has one"""
         self.smells = []
         raw_source = ast_data.get("_raw_source")
 
         if raw_source:
             self.lines = raw_source.splitlines()
+            content_hash = hashlib.md5(raw_source.encode()).hexdigest()
+            cache_key = ("Python", content_hash)
+            cached = _lru_get(self._smell_cache, cache_key)
+            if cached is not None:
+                self.smells = list(cached)
+                return self.smells
             try:
-                content_hash = hashlib.md5(raw_source.encode()).hexdigest()
-                if content_hash in self._ast_cache:
-                    tree = self._ast_cache[content_hash]
-                else:
+                if tree is None:
+                    tree = _lru_get(self._ast_cache, content_hash)
+                if tree is None:
                     tree = ast.parse(raw_source)
-                    self._ast_cache[content_hash] = tree
+                    _lru_put(self._ast_cache, content_hash, tree)
 
                 self._detect_long_functions(tree)
                 self._detect_deep_nesting(tree)
@@ -1443,6 +1483,7 @@ class CodeSmellDetector:
                     f"Syntax error in Python code: {str(e)}", 0,
                     "Fix syntax errors before analyzing code smells"
                 ))
+            self._store_smells(cache_key)
         else:
             # Fallback: basic structural checks
             functions = ast_data.get("functions", [])
@@ -1469,6 +1510,11 @@ class CodeSmellDetector:
 
         if raw_source:
             self.lines = raw_source.splitlines()
+            cache_key = ("Java", hashlib.md5(raw_source.encode()).hexdigest())
+            cached = _lru_get(self._smell_cache, cache_key)
+            if cached is not None:
+                self.smells = list(cached)
+                return self.smells
             self._detect_long_methods_java(raw_source)
             self._detect_deep_nesting_java(raw_source)
             self._detect_long_parameter_lists_java(raw_source)
@@ -1482,6 +1528,7 @@ class CodeSmellDetector:
             # self._detect_global_usage(raw_source)
             # self._detect_system_calls(raw_source)
             # self._detect_list_modification_during_iteration(raw_source)
+            self._store_smells(cache_key)
         else:
             methods = ast_data.get("methods", [])
             fields = ast_data.get("fields", [])
@@ -1500,6 +1547,24 @@ class CodeSmellDetector:
 
         return self.smells
 
+    # Language -> entry point, so callers only run the detectors that apply
+    _LANGUAGE_DETECTORS = {
+        "Python": detect_python_smells,
+        "Java": detect_java_smells,
+    }
+
+    def detect_smells(self, ast_data: dict) -> List[CodeSmell]:
+        """Detect smells using the detectors for ast_data's language"""
+        detect = self._LANGUAGE_DETECTORS.get(ast_data.get("language"))
+        if detect is None:
+            self.smells = []
+            return self.smells
+        return detect(self, ast_data)
+
+    def _store_smells(self, cache_key):
+        """Remember the smells found for a source so re-analysis is a lookup"""
+        _lru_put(self._smell_cache, cache_key, tuple(self.smells))
+
     def get_smell_summary(self) -> Dict[str, Any]:
         """Get a summary of detected code smells"""
         if not self.smells:
@@ -1511,11 +1576,8 @@ class CodeSmellDetector:
             }
 
         by_severity = {"critical": 0, "high": 0, "medium": 0, "low": 0}
-        by_type = {}
-
-        for smell in self.smells:
-            by_severity[smell.severity] = by_severity.get(smell.severity, 0) + 1
-            by_type[smell.smell_type] = by_type.get(smell.smell_type, 0) + 1
+        by_severity.update(Counter(s.severity for s in self.smells))
+        by_type = dict(Counter(s.smell_type for s in self.smells))
 
         return {
             "total_smells": len(self.smells),
@@ -1581,33 +1643,38 @@ class CodeSmellDetector:
     def _detect_duplicate_code_python(self, tree):
         """Detect duplicate code patterns in Python"""
         functions = [node for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
+        # Walk each function once; the pairwise check then compares two ints
+        sizes = [self._count_statement_nodes(func) for func in functions]
 
         for i, func1 in enumerate(functions):
-            for func2 in functions[i + 1:]:
-                if self._functions_are_similar(func1, func2):
+            size1 = sizes[i]
+            if size1 <= 5:
+                continue
+            for j in range(i + 1, len(functions)):
+                if abs(size1 - sizes[j]) <= 2:
                     self.smells.append(CodeSmell(
                         "duplicate_code", "medium",
-                        f"Functions '{func1.name}' and '{func2.name}' appear to be similar",
+                        f"Functions '{func1.name}' and '{functions[j].name}' appear to be similar",
                         func1.lineno,
                         "Consider extracting common functionality into a shared function"
                     ))
 
-    def _functions_are_similar(self, func1, func2):
-        func1_lines = len([n for n in ast.walk(func1) if isinstance(n, (ast.Assign, ast.Call, ast.Return))])
-        func2_lines = len([n for n in ast.walk(func2) if isinstance(n, (ast.Assign, ast.Call, ast.Return))])
-        return abs(func1_lines - func2_lines) <= 2 and func1_lines > 5
+    def _count_statement_nodes(self, func):
+        """Number of assignments, calls and returns inside a function"""
+        return sum(1 for n in ast.walk(func) if isinstance(n, (ast.Assign, ast.Call, ast.Return)))
 
     def _detect_magic_numbers(self, content: str):
         """Detect magic numbers in code"""
         magic_number_pattern = re.compile(r'\b(?<![\w.])([2-9]|[1-9]\d+)(?![\w.])\b')
         lines = content.split('\n')
+        append = self.smells.append  # bound once for the per-line loop
 
         for line_idx, line in enumerate(lines, 1):
             for match in magic_number_pattern.finditer(line):
                 number = match.group(1)
                 try:
                     if int(number) > 10:
-                        self.smells.append(CodeSmell(
+                        append(CodeSmell(
                             "magic_number", "low",
                             f"Magic number '{number}' found",
                             line_idx,
@@ -1694,16 +1761,16 @@ class CodeSmellDetector:
     # ─────────────────────────────────────────────
 
     def _detect_long_methods_java(self, content: str):
-        class_names = set(re.findall(r'class\s+(\w+)', content))
-        method_pattern = r'(public|private|protected)\s+(static\s+)?(\w+(?:<[^>]+>)?)\s+(\w+)\s*\([^)]*\)\s*(?:throws\s+[\w,\s]+)?\s*\{'
+        class_names = set(_JAVA_CLASS_NAME_RE.findall(content))
 
-        for match in re.finditer(method_pattern, content):
+        for match in _JAVA_METHOD_DECL_RE.finditer(content):
             return_type = match.group(3)
             method_name = match.group(4)
             if method_name in class_names or return_type == method_name:
                 continue
-            start_line = content[:match.start()].count('\n') + 1
-            method_end_line = self._find_method_end_line(content, match.end())
+            start_line = content.count('\n', 0, match.start()) + 1
+            method_end = self._find_block_end(content, match.end())
+            method_end_line = content.count('\n', 0, method_end) + 1
             method_length = method_end_line - start_line + 1
 
             if method_name == 'main':
@@ -1724,23 +1791,27 @@ class CodeSmellDetector:
                     "Consider breaking this method into smaller methods"
                 ))
 
-    def _find_method_end_line(self, content: str, start_pos: int) -> int:
-        brace_count = 1
-        pos = start_pos
-        while pos < len(content) and brace_count > 0:
-            if content[pos] == '{':
-                brace_count += 1
-            elif content[pos] == '}':
-                brace_count -= 1
-            pos += 1
-        return content[:pos].count('\n') + 1
+    def _find_block_end(self, content: str, start_pos: int, depth: int = 1) -> int:
+        """Return the index of the brace closing the block open at start_pos"""
+        # Jump between braces instead of stepping through every character
+        opened = depth > 0
+        for match in _BRACE_RE.finditer(content, start_pos):
+            if match.group() == '{':
+                depth += 1
+                opened = True
+            else:
+                depth -= 1
+                if opened and depth == 0:
+                    return match.start()
+        return len(content)
 
     def _detect_deep_nesting_java(self, content: str):
         lines = content.split('\n')
+        append = self.smells.append
         for i, line in enumerate(lines):
             nesting_level = line.count('{') - line.count('}')
             if nesting_level > 4:
-                self.smells.append(CodeSmell(
+                append(CodeSmell(
                     "deep_nesting", "medium",
                     f"Deep nesting detected (level {nesting_level})",
                     i + 1,
@@ -1748,14 +1819,13 @@ class CodeSmellDetector:
                 ))
 
     def _detect_long_parameter_lists_java(self, content: str):
-        method_pattern = r'(public|private|protected)?\s*(static)?\s*\w+\s+\w+\s*\(([^)]*)\)'
-        for match in re.finditer(method_pattern, content):
+        for match in _JAVA_PARAMS_RE.finditer(content):
             params = match.group(3).strip()
             if params:
                 param_count = len([p.strip() for p in params.split(',') if p.strip()])
                 if param_count > 5:
                     severity = "high" if param_count > 8 else "medium"
-                    line_num = content[:match.start()].count('\n') + 1
+                    line_num = content.count('\n', 0, match.start()) + 1
                     self.smells.append(CodeSmell(
                         "long_parameter_list", severity,
                         f"Method has {param_count} parameters",
@@ -1764,23 +1834,16 @@ class CodeSmellDetector:
                     ))
 
     def _detect_god_classes_java(self, content: str):
-        class_pattern = r'class\s+\w+\s*\{'
-        for match in re.finditer(class_pattern, content):
+        for match in _JAVA_CLASS_OPEN_RE.finditer(content):
             class_start = match.end()
-            class_end = self._find_class_end(content, class_start)
+            class_end = self._find_block_end(content, class_start, depth=0)
             class_content = content[class_start:class_end]
 
-            method_count = len(re.findall(
-                r'(public|private|protected)?\s*(static)?\s*\w+\s+\w+\s*\([^)]*\)\s*\{',
-                class_content
-            ))
-            field_count = len(re.findall(
-                r'(public|private|protected)?\s*(static)?\s*(final)?\s*\w+\s+\w+;',
-                class_content
-            ))
+            method_count = len(_JAVA_METHOD_BODY_RE.findall(class_content))
+            field_count = len(_JAVA_FIELD_RE.findall(class_content))
 
             if method_count > 15 or field_count > 20:
-                line_num = content[:match.start()].count('\n') + 1
+                line_num = content.count('\n', 0, match.start()) + 1
                 self.smells.append(CodeSmell(
                     "god_class", "high",
                     f"Class has {method_count} methods and {field_count} fields",
@@ -1788,33 +1851,25 @@ class CodeSmellDetector:
                     "Consider splitting this class into smaller, focused classes"
                 ))
 
-    def _find_class_end(self, content, start_pos):
-        brace_count = 0
-        in_class = False
-        for i, char in enumerate(content[start_pos:], start_pos):
-            if char == '{':
-                brace_count += 1
-                in_class = True
-            elif char == '}':
-                brace_count -= 1
-                if in_class and brace_count == 0:
-                    return i
-        return len(content)
-
     def _detect_println_in_domain_classes(self, content: str):
+        # Literal pre-checks are a C-level substring scan; skip the line loop
+        # and its regexes entirely when they cannot match
+        if 'System.out' not in content:
+            return
         allowed_classes = ['Main', 'Console', 'Printer', 'View', 'UI', 'CLI', 'App', 'Application']
         lines = content.split('\n')
+        append = self.smells.append
         current_class = None
         brace_depth = 0
 
         for i, line in enumerate(lines):
-            class_match = re.search(r'class\s+(\w+)', line)
+            class_match = 'class' in line and _JAVA_CLASS_NAME_RE.search(line)
             if class_match:
                 current_class = class_match.group(1)
             brace_depth += line.count('{') - line.count('}')
             if current_class and 'System.out' in line:
                 if not any(allowed in current_class for allowed in allowed_classes):
-                    self.smells.append(CodeSmell(
+                    append(CodeSmell(
                         "println_in_domain", "medium",
                         f"System.out in domain class '{current_class}' violates Single Responsibility",
                         i + 1,
@@ -1822,13 +1877,15 @@ class CodeSmellDetector:
                     ))
 
     def _detect_null_returns_java(self, content: str):
+        if 'return null;' not in content:
+            return
         lines = content.split('\n')
         for i, line in enumerate(lines):
             if 'return null;' in line.strip():
                 for j in range(max(0, i - 10), i):
                     method_line = lines[j].strip()
-                    if re.search(r'(public|private|protected)\s+\w+\s+\w+\s*\(', method_line):
-                        if not re.search(r'(void|int|long|double|float|boolean|byte|short|char)\s+\w+\s*\(', method_line):
+                    if _JAVA_SIGNATURE_RE.search(method_line):
+                        if not _JAVA_PRIMITIVE_SIGNATURE_RE.search(method_line):
                             self.smells.append(CodeSmell(
                                 "null_return", "medium",
                                 "Method returns null - consider using Optional<T>",
@@ -1838,12 +1895,15 @@ class CodeSmellDetector:
                             break
 
     def _detect_poor_encapsulation_java(self, content: str):
+        if 'public' not in content:
+            return
         lines = content.split('\n')
+        append = self.smells.append
         for i, line in enumerate(lines):
             stripped = line.strip()
-            if re.match(r'public\s+(?!static|final|class|interface|enum|void|abstract)', stripped):
-                if re.search(r'public\s+\w+\s+\w+\s*[;=]', stripped):
-                    self.smells.append(CodeSmell(
+            if stripped.startswith('public') and _JAVA_PUBLIC_MEMBER_RE.match(stripped):
+                if _JAVA_PUBLIC_FIELD_RE.search(stripped):
+                    append(CodeSmell(
                         "public_field", "medium",
                         "Public field detected - breaks encapsulation",
                         i + 1,
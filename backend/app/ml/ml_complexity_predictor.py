@@ -1,21 +1,97 @@
 import pandas as pd
 import numpy as np
+
+# Optional: with scikit-learn-intelex installed (pip install scikit-learn-intelex),
+# the forest runs on oneDAL's vectorized kernels. Must patch before the sklearn
+# imports below. Models trained this way need sklearnex to be loaded again.
+try:
+    from sklearnex import patch_sklearn
+    patch_sklearn(["random_forest_classifier"], verbose=False)
+except ImportError:
+    pass
+
 from sklearn.model_selection import train_test_split
 from sklearn.ensemble import RandomForestClassifier
-from sklearn.svm import SVC
+from sklearn.svm import SVC, LinearSVC
+from sklearn.kernel_approximation import Nystroem
+from sklearn.calibration import CalibratedClassifierCV
+from sklearn.pipeline import make_pipeline
 from sklearn.neural_network import MLPClassifier
-from sklearn.ensemble import GradientBoostingClassifier, VotingClassifier
+from sklearn.ensemble import GradientBoostingClassifier, HistGradientBoostingClassifier, VotingClassifier
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.metrics import accuracy_score, classification_report, confusion_matrix
 from sklearn.preprocessing import StandardScaler, LabelEncoder
 from sklearn.impute import SimpleImputer
 import joblib
+from joblib import Parallel, delayed
+import copy
+import hashlib
 import os
 import re
+from collections import OrderedDict
 from typing import Dict, List, Tuple, Any
 
 from app.core.config import BASE_DIR
 
+# lz4 decompresses faster than the file can be read, so use it when it's
+# installed. zlib/gzip would shrink the file but make load_model slower, and
+# the saved model is only ~125 KB uncompressed.
+try:
+    import lz4  # noqa: F401 - registers joblib's 'lz4' compressor
+    _MODEL_COMPRESS = ('lz4', 3)
+except ImportError:
+    _MODEL_COMPRESS = 0
+
+# Tree ensembles split on per-feature thresholds, so standardizing their
+# input changes nothing; they are trained and queried on unscaled features
+_SCALE_FREE_MODELS = (RandomForestClassifier, GradientBoostingClassifier, HistGradientBoostingClassifier)
+
+# Model files loaded in this process, shared by every predictor (one per
+# ASTParser/FeatureRouter): abspath -> ((st_ino, st_size, st_mtime_ns), data)
+_loaded_models = {}
+
+# Predictions kept per predictor, keyed by a hash of the scored source
+_PREDICTION_CACHE_SIZE = 4096
+
+# Feature-extraction patterns. Each starts with its keyword so the regex
+# engine can skip ahead to candidates; the (?<!\w...) lookbehinds stand in for
+# a leading \b. The line-count patterns swallow the rest of the line, so
+# findall() yields at most one hit per line, matching the old per-line loop.
+_IF_LINE_RE = re.compile(r'if(?<!\wif)[^\S\n]*\([^\n]*')
+_LOOP_LINE_RE = re.compile(r'(?:for|while|do)\b(?<!\wfor)(?<!\wwhile)(?<!\wdo)[^\n]*')
+_BREAK_LINE_RE = re.compile(r'break\b(?<!\wbreak)[^\n]*')
+_SORT_RE = re.compile(r'sort(?:ed)?(?<!\wsort)(?<!\wsorted)\s*\(')
+_RECURSION_RE = re.compile(r'\breturn\b.*\b(self\.|this\.)')
+# Lines that change the loop depth: one that contains a loop keyword, or else
+# one that starts by closing a block
+_DEPTH_LINE_RE = re.compile(
+    r'(?P<loop>(?:for|while|do)\b(?<!\wfor)(?<!\wwhile)(?<!\wdo))[^\n]*'
+    r'|^[^\S\n]*(?:\}|end)(?![^\n]*?\b(?:for|while|do)\b)[^\n]*',
+    re.MULTILINE,
+)
+
+def _fit_and_score(model, X_train, y_train, X_test, y_test):
+    """Fit one training candidate and return it with its test accuracy"""
+    model.fit(X_train, y_train)
+    return model, accuracy_score(y_test, model.predict(X_test))
+
+
+def _load_model_file(path):
+    """joblib.load path once per process; reload only when the file changes"""
+    st = os.stat(path)
+    identity = (st.st_ino, st.st_size, st.st_mtime_ns)
+    key = os.path.abspath(path)
+    cached = _loaded_models.get(key)
+    if cached is not None and cached[0] == identity:
+        return cached[1]
+    # Uncompressed files are memory-mapped: the estimator arrays are read
+    # straight from the page cache, shared with every other process (e.g.
+    # the analyze-all workers) that maps the same file
+    model_data = joblib.load(path, mmap_mode=None if _MODEL_COMPRESS else 'r')
+    _loaded_models[key] = (identity, model_data)
+    return model_data
+
+
 class ComplexityPredictor:
     """
     Machine Learning model for predicting code complexity based on code features
@@ -42,6 +118,14 @@ class ComplexityPredictor:
             'nlogn': 'O(n log n)'
         }
         self._model_loaded = False  # Track if model is loaded
+        self._scaled = True  # Whether the model expects StandardScaler output
+        # imputer.statistics_, scaler.mean_ and scaler.scale_, taken out at
+        # load time so prediction is plain array math (None until loaded)
+        self._impute = self._mean = self._scale = None
+        self._class_names = ()  # label_encoder.classes_ as a tuple, same time
+        self._class_descs = ()  # complexity_mapping of each class name
+        # blake2b(code) -> (features, prediction); cleared whenever the model changes
+        self._prediction_cache = OrderedDict()
 
     def verify_preprocessing(self, csv_path: str) -> bool:
         """
@@ -64,18 +148,19 @@ class ComplexityPredictor:
             # 4. Remove duplicates quietly
             df = df.drop_duplicates()
 
-            # 5. Extract feature matrix
+            # 5. Check the feature matrix is something the imputer and scaler
+            # accept, without fitting them (training fits them itself)
             X = df[self.feature_columns]
-
-            # 6. Impute quietly
-            self.imputer.fit_transform(X)
-
-            # 7. Scale quietly
-            self.scaler.fit_transform(X)
-
-            # 8. Encode labels quietly
-            y = df['complexity'].values
-            self.label_encoder.fit_transform(y)
+            if X.empty:
+                print("Preprocessing failed: no complete rows in dataset")
+                return False
+            for col in self.feature_columns:
+                if not pd.api.types.is_numeric_dtype(X[col]):
+                    print(f"Preprocessing failed: column {col} is not numeric")
+                    return False
+            if not np.isfinite(X.to_numpy(dtype=np.float64)).all():
+                print("Preprocessing failed: features contain infinite values")
+                return False
 
             print("Preprocessing completed successfully.")
             return True
@@ -123,14 +208,16 @@ class ComplexityPredictor:
             # Advanced outlier analysis
             numerical_features = ['no_of_ifs', 'no_of_loop', 'no_of_break', 'no_of_sort', 'nested_loop_depth']
             # print("\nOutlier analysis (IQR method):")
-            for feature in numerical_features:
-                if feature in df.columns:
-                    Q1 = df[feature].quantile(0.25)
-                    Q3 = df[feature].quantile(0.75)
-                    IQR = Q3 - Q1
-                    outliers = df[(df[feature] < Q1 - 1.5 * IQR) | (df[feature] > Q3 + 1.5 * IQR)]
-                    outlier_percentage = len(outliers)/len(df)*100
-                    # print(f"  {feature}: {len(outliers)} outliers ({outlier_percentage:.1f}%)")
+            numerical_features = [feature for feature in numerical_features if feature in df.columns]
+            if numerical_features:
+                # All quartiles in one call, then one broadcast comparison
+                Q1, Q3 = df[numerical_features].quantile([0.25, 0.75]).to_numpy()
+                IQR = Q3 - Q1
+                values = df[numerical_features].to_numpy()
+                outlier_counts = ((values < Q1 - 1.5 * IQR) | (values > Q3 + 1.5 * IQR)).sum(axis=0)
+                outlier_percentages = outlier_counts / len(df) * 100
+                # for feature, count, pct in zip(numerical_features, outlier_counts, outlier_percentages):
+                #     print(f"  {feature}: {count} outliers ({pct:.1f}%)")
             
             # print("\nComplexity distribution:")
             # print(df['complexity'].value_counts())
@@ -145,20 +232,22 @@ class ComplexityPredictor:
         # print("\nAdvanced Feature Engineering:")
         # print("-" * 50)
         
-        # Select feature columns
-        X = df[self.feature_columns].copy()
+        # Select feature columns straight into one contiguous float matrix
+        # (float64: the scaled candidates are queried in float64 too)
+        X = df[self.feature_columns].to_numpy(dtype=np.float64)
         
         # Handle missing values with imputation
         # print("Applying missing value imputation...")
         X_imputed = self.imputer.fit_transform(X)
         
-        # Feature scaling (StandardScaler) for better model performance
+        # Fit the scaler here; train_model applies it only for the
+        # candidates that need it (not the tree ensembles)
         # print("Applying feature scaling (StandardScaler)...")
-        X_scaled = self.scaler.fit_transform(X_imputed)
+        self.scaler.fit(X_imputed)
         
         # Encode complexity labels properly
         # print("Encoding complexity labels...")
-        y = df['complexity'].values
+        y = df['complexity'].to_numpy()
         y_encoded = self.label_encoder.fit_transform(y)
         
         # print(f"Original features shape: {X.shape}")
@@ -176,7 +265,7 @@ class ComplexityPredictor:
         # for i, label in enumerate(self.label_encoder.classes_):
         #     print(f"  {label} -> {i}")
         
-        return X_scaled, y_encoded
+        return X_imputed, y_encoded
     
     def train_model(self, csv_path: str, test_size: float = 0.2, random_state: int = 42, force_retrain: bool = False):
         """Train multiple models (RF, SVM, NN, GB, KNN) and compare their performance"""
@@ -207,6 +296,12 @@ class ComplexityPredictor:
             X, y, test_size=test_size, random_state=random_state, stratify=y
         )
         
+        X_train_scaled = self.scaler.transform(X_train)
+        # Tree builders work on column-major float32 and copy anything else
+        # into that layout; do it once here for the tree candidates
+        X_train_trees = np.asfortranarray(X_train, dtype=np.float32)
+        X_test_scaled = self.scaler.transform(X_test)
+        
         # print(f"Training set: {X_train.shape[0]} samples")
         # print(f"Test set: {X_test.shape[0]} samples")
         
@@ -222,11 +317,24 @@ class ComplexityPredictor:
 
         # Train (RF, SVM, NN, GB, KNN) models
         models = {
+            # 30 trees of depth 6: smallest setting within 0.5% of 100 x depth-10
+            # in a 5-fold CV grid over n_estimators {20,30,50,100} x max_depth {4,6,8,10}
             "RandomForest": RandomForestClassifier(
-                n_estimators=100, random_state=random_state,
-                max_depth=10, min_samples_split=5, min_samples_leaf=2, class_weight='balanced', max_features='sqrt'
+                n_estimators=30, n_jobs=-1, random_state=random_state,
+                max_depth=6, min_samples_split=5, min_samples_leaf=2, class_weight='balanced', max_features='sqrt'
+            ),
+            # Features are small integers, so binning into histograms loses nothing
+            "HGB": HistGradientBoostingClassifier(
+                max_iter=200, max_depth=8, early_stopping=True, random_state=random_state, class_weight='balanced'
+            ),
+            # RBF kernel approximated with 100 Nystroem components, so training is
+            # linear in the sample count; gamma=None is 1/n_features, which is what
+            # SVC's gamma='scale' works out to on standardized input. LinearSVC has
+            # no predict_proba, hence the calibration wrapper
+            "ApproxSVM": make_pipeline(
+                Nystroem(n_components=100, random_state=random_state),
+                CalibratedClassifierCV(LinearSVC(C=1.0, dual=False, class_weight='balanced'), ensemble=False),
             ),
-            "LinearSVM": SVC(kernel='rbf', probability=True, random_state=random_state, class_weight='balanced', C=1.0, gamma='scale'),
             "NeuralNetwork": MLPClassifier(hidden_layer_sizes=(128, 64, 32), max_iter=2000, random_state=random_state),
             "KNN": KNeighborsClassifier(n_neighbors=20)
         }
@@ -235,12 +343,18 @@ class ComplexityPredictor:
         best_accuracy = 0
         best_model_name = None
         
-        # Train and evaluate all models
-        for name, model in models.items():
-            # print(f"\n{'-' * 50}\nTraining model: {name}")
-            model.fit(X_train, y_train)
-            y_pred = model.predict(X_test)
-            accuracy = accuracy_score(y_test, y_pred)
+        # Train and evaluate all models; the candidates are independent, so
+        # they fit in parallel, one per core (sequential on a single core)
+        scaled_flags = [not isinstance(model, _SCALE_FREE_MODELS) for model in models.values()]
+        fitted = Parallel(n_jobs=min(len(models), os.cpu_count() or 1))(
+            delayed(_fit_and_score)(
+                model,
+                X_train_scaled if scaled else X_train_trees, y_train,
+                X_test_scaled if scaled else X_test, y_test,
+            )
+            for model, scaled in zip(models.values(), scaled_flags)
+        )
+        for name, scaled, (model, accuracy) in zip(models, scaled_flags, fitted):
             # print(f"✅ {name} Accuracy: {accuracy:.4f}")
             results[name] = accuracy
 
@@ -249,6 +363,7 @@ class ComplexityPredictor:
                 best_accuracy = accuracy
                 best_model_name = name
                 self.model = model
+                self._scaled = scaled
         print("-"*50)
         print("\nML tranined models")
         print("\nModel Comparison Results:")
@@ -294,7 +409,7 @@ class ComplexityPredictor:
         # print(f"\n🏆 Best Model: {best_model_name} with Accuracy = {best_accuracy:.4f}")
 
         # Evaluate final model
-        y_pred_final = self.model.predict(X_test)
+        y_pred_final = self.model.predict(X_test_scaled if self._scaled else X_test)
         print("\nFinal Model Classification Report:")
         print(classification_report(y_test, y_pred_final))
 
@@ -328,9 +443,12 @@ class ComplexityPredictor:
                 'model': self.model,
                 'scaler': self.scaler,
                 'label_encoder': self.label_encoder,
-                'imputer': self.imputer
+                'imputer': self.imputer,
+                'scaled': self._scaled
             }
-            joblib.dump(model_data, self.model_path)
+            # Protocol 5 writes the estimators' numpy buffers out-of-band, without extra copies
+            joblib.dump(model_data, self.model_path, compress=_MODEL_COMPRESS, protocol=5)
+            self._prediction_cache.clear()
             # print("SUCCESS: Model and preprocessing objects saved successfully!")
         else:
             print("ERROR: No model to save!")
@@ -339,21 +457,32 @@ class ComplexityPredictor:
         """Load a pre-trained model and preprocessing objects"""
         try:
             if os.path.exists(self.model_path):
-                model_data = joblib.load(self.model_path)
+                model_data = _load_model_file(self.model_path)
                 
                 # Handle both old format (just model) and new format (with preprocessing)
                 if isinstance(model_data, dict):
                     self.model = model_data['model']
-                    self.scaler = model_data['scaler']
-                    self.label_encoder = model_data['label_encoder']
-                    self.imputer = model_data['imputer']
+                    # Shallow copies: the loaded file is shared, and training
+                    # refits these on this predictor only
+                    self.scaler = copy.copy(model_data['scaler'])
+                    self.label_encoder = copy.copy(model_data['label_encoder'])
+                    self.imputer = copy.copy(model_data['imputer'])
+                    # Models saved before this flag existed were all trained on scaled input
+                    self._scaled = model_data.get('scaled', True)
                     print(f"SUCCESS: Model and preprocessing objects loaded from: {self.model_path}")
                 else:
                     # Old format - just the model
                     self.model = model_data
                     print(f"WARNING: Model loaded from: {self.model_path} (legacy format - no preprocessing)")
                 
+                # Trees are fitted in parallel, but predictions here are one
+                # sample at a time, where joblib dispatch costs more than it saves
+                if hasattr(self.model, 'n_jobs'):
+                    self.model.n_jobs = 1
+                
+                self._bake_preprocessing()
                 self._model_loaded = True
+                self._prediction_cache.clear()
                 return True
             else:
                 print(f"ERROR: Model file not found: {self.model_path}")
@@ -362,65 +491,96 @@ class ComplexityPredictor:
             print(f"ERROR: Error loading model: {e}")
             return False
     
+    def _bake_preprocessing(self):
+        """Pull the fitted imputer/scaler parameters into plain arrays"""
+        try:
+            self._impute = self.imputer.statistics_
+            self._mean = self.scaler.mean_
+            self._scale = self.scaler.scale_
+            self._class_names = tuple(self.label_encoder.classes_)
+        except AttributeError:
+            self._impute = self._mean = self._scale = None
+            self._class_names = ()
+        self._class_descs = tuple(self.complexity_mapping.get(name, name) for name in self._class_names)
+    
     def predict_complexity(self, features: Dict[str, int]) -> Dict[str, Any]:
         """Predict complexity for given features with advanced preprocessing"""
+        return self.predict_many([features])[0]
+    
+    def predict_many(self, features_list: List[Dict[str, int]]) -> List[Dict[str, Any]]:
+        """Predict complexity for many feature dicts with one pass through
+        the preprocessing and one call into the model"""
         if self.model is None or not self._model_loaded:
             if not self.load_model():
-                return {"error": "No trained model available"}
+                return [{"error": "No trained model available"} for _ in features_list]
+        if not features_list:
+            return []
         
         try:
-            # # Prepare feature vector in the same order as training
-            # feature_vector = np.array([[
-            #     features.get('no_of_ifs', 0),
-            #     features.get('no_of_loop', 0),
-            #     features.get('no_of_break', 0),
-            #     features.get('priority_queue_present', 0),
-            #     features.get('no_of_sort', 0),
-            #     features.get('hash_set_present', 0),
-            #     features.get('hash_map_present', 0),
-            #     features.get('recursion_present', 0),
-            #     features.get('nested_loop_depth', 0)
-            # ]])
-
-            # Build a DataFrame with EXACT SAME columns as training
-            X = pd.DataFrame([{
-                'no_of_ifs': features.get('no_of_ifs', 0),
-                'no_of_loop': features.get('no_of_loop', 0),
-                'no_of_break': features.get('no_of_break', 0),
-                'priority_queue_present': features.get('priority_queue_present', 0),
-                'no_of_sort': features.get('no_of_sort', 0),
-                'hash_set_present': features.get('hash_set_present', 0),
-                'hash_map_present': features.get('hash_map_present', 0),
-                'recursion_present': features.get('recursion_present', 0),
-                'nested_loop_depth': features.get('nested_loop_depth', 0)
-            }], columns=self.feature_columns)
-            
-            # Apply same preprocessing as training
-            X_imputed = self.imputer.transform(X)
-            X_scaled = self.scaler.transform(X_imputed)
-
-            # Make prediction
-            prediction_encoded = self.model.predict(X_scaled)[0]
-            probabilities = self.model.predict_proba(X_scaled)[0]
-
-            # Decode prediction back to original label
-            # prediction = self.label_encoder.inverse_transform([prediction_encoded])[0]
-            prediction = self.label_encoder.inverse_transform([prediction_encoded])[0]
-
-
-            # Get class names and probabilities
-            class_names = self.label_encoder.classes_
-            prob_dict = {class_names[i]: probabilities[i] for i in range(len(class_names))}
+            # One row per dict, in training column order. Trees compare in
+            # float32 internally, so they get float32 directly; scaled models
+            # keep float64 so their distances/weights match training exactly
+            X = np.array(
+                [[features.get(column, 0) for column in self.feature_columns] for features in features_list],
+                dtype=np.float64 if self._scaled else np.float32,
+            )
             
-            return {
-                "predicted_complexity": prediction,
-                "complexity_description": self.complexity_mapping.get(prediction, prediction),
-                "confidence": max(probabilities),
-                "all_probabilities": prob_dict
-            }
+            # Apply same preprocessing as training. The dicts are normally
+            # complete, and median imputation of complete rows is a no-op
+            if self._mean is None:
+                # Legacy model file without fitted preprocessing: transform()
+                # raises and the rows come back as prediction errors
+                X_scaled = self.scaler.transform(self.imputer.transform(X))
+            else:
+                if np.isnan(X).any():
+                    X = np.where(np.isnan(X), self._impute, X)
+                # Same operations, in the same order, as StandardScaler.transform
+                X_scaled = (X - self._mean) / self._scale if self._scaled else X
+
+            # Make predictions: the label is the most probable class, so one
+            # predict_proba call yields both
+            probabilities = self.model.predict_proba(X_scaled)
+            if isinstance(self.model, SVC):
+                # SVC's Platt-scaled probabilities can disagree with its own predict
+                # (models saved before the candidate became ApproxSVM)
+                predictions_encoded = self.model.predict(X_scaled)
+            else:
+                predictions_encoded = self.model.classes_[probabilities.argmax(axis=1)]
+
+            # Decode predictions back to original labels; names and
+            # descriptions are indexed by encoded class
+            results = []
+            for encoded, row in zip(predictions_encoded.tolist(), probabilities.tolist()):
+                prob_dict = dict(zip(self._class_names, row))
+                results.append({
+                    "predicted_complexity": self._class_names[encoded],
+                    "complexity_description": self._class_descs[encoded],
+                    "confidence": max(row),
+                    "all_probabilities": prob_dict
+                })
+            return results
             
         except Exception as e:
-            return {"error": f"Prediction failed: {e}"}
+            return [{"error": f"Prediction failed: {e}"} for _ in features_list]
+    
+    def predict_from_code(self, code_content: str) -> Dict[str, Any]:
+        """Extract features from code and predict its complexity, reusing the
+        result when the same code has been scored before"""
+        key = hashlib.blake2b(code_content.encode('utf-8', 'surrogatepass'), digest_size=16).digest()
+        cached = self._prediction_cache.get(key)
+        if cached is not None:
+            self._prediction_cache.move_to_end(key)
+            features, prediction = cached
+        else:
+            features = self.extract_features_from_code(code_content)
+            prediction = self.predict_complexity(features)
+            # Errors aren't cached: the model may still be loading or training
+            if "error" not in prediction:
+                self._prediction_cache[key] = (features, prediction)
+                if len(self._prediction_cache) > _PREDICTION_CACHE_SIZE:
+                    self._prediction_cache.popitem(last=False)
+        # Copies, so callers can't alter what later hits return
+        return {"features": dict(features), "prediction": dict(prediction)}
     
     def extract_features_from_code(self, code_content: str) -> Dict[str, int]:
         """Extract complexity features from code content (optimized)"""
@@ -436,35 +596,19 @@ class ComplexityPredictor:
             'nested_loop_depth': 0
         }
         
-        lines = code_content.split('\n')
         content_lower = code_content.lower()
         
-        # Use compiled regex patterns for better performance
-        if_pattern = re.compile(r'\bif\s*[\(]')
-        loop_pattern = re.compile(r'\b(for|while|do)\b')
-        break_pattern = re.compile(r'\bbreak\b')
-        
-        # Count basic features (single pass)
-        for line in lines:
-            line_lower = line.lower().strip()
-            
-            # Count if statements
-            if if_pattern.search(line_lower):
-                features['no_of_ifs'] += 1
-            
-            # Count loops
-            if loop_pattern.search(line_lower):
-                features['no_of_loop'] += 1
-            
-            # Count break statements
-            if break_pattern.search(line_lower):
-                features['no_of_break'] += 1
+        # Whole-text scans in the regex engine; the counts are numbers of
+        # lines containing each construct
+        features['no_of_ifs'] = len(_IF_LINE_RE.findall(content_lower))
+        features['no_of_loop'] = len(_LOOP_LINE_RE.findall(content_lower))
+        features['no_of_break'] = len(_BREAK_LINE_RE.findall(content_lower))
         
         # Check for data structures (single pass through content)
         if 'priorityqueue' in content_lower or 'priority_queue' in content_lower:
             features['priority_queue_present'] = 1
         
-        features['no_of_sort'] = len(re.findall(r'\b(sort|sorted)\s*\(', content_lower))
+        features['no_of_sort'] = len(_SORT_RE.findall(content_lower))
         
         if 'hashset' in content_lower or ('set' in content_lower and 'hash' in content_lower):
             features['hash_set_present'] = 1
@@ -473,20 +617,20 @@ class ComplexityPredictor:
             features['hash_map_present'] = 1
         
         # Check for recursion
-        if re.search(r'\breturn\b.*\b(self\.|this\.)', content_lower):
+        if _RECURSION_RE.search(content_lower):
             features['recursion_present'] = 1
         
-        # Calculate nested loop depth (optimized)
+        # Nested loop depth: only lines that open a loop or close a block
+        # matter, so visit just those instead of every line
         max_depth = 0
         current_depth = 0
         
-        for line in lines:
-            line_stripped = line.strip()
-            if loop_pattern.search(line_stripped):
+        for match in _DEPTH_LINE_RE.finditer(code_content):
+            if match.group('loop') is not None:
                 current_depth += 1
                 max_depth = max(max_depth, current_depth)
-            elif line_stripped.startswith('}') or line_stripped.startswith('end'):
-                current_depth = max(0, current_depth - 1)
+            elif current_depth:
+                current_depth -= 1
         
         features['nested_loop_depth'] = max_depth
         
@@ -1,36 +1,89 @@
 import ast
-import code
 import os
+from ast import iter_child_nodes
+from collections import OrderedDict
+from functools import cached_property
 
-from sklearn import tree
 from app.ml.code_smell_detector import CodeSmellDetector
 from app.services.code_quality_metrics import CodeQualityAnalyzer
-from app.ml.ml_complexity_predictor import ComplexityPredictor
 
 try:
     import javalang
 except ImportError:
     javalang = None
 
+# Analyses kept per parser, keyed by the file's path and stat identity
+_PARSE_CACHE_SIZE = 256
+
+# Nodes that add a branch to cyclomatic complexity
+_DECISION_NODES = (ast.If, ast.For, ast.While, ast.And, ast.Or, ast.ExceptHandler, ast.With, ast.Try)
+
+
+def _count_java_nodes(root):
+    """Count the nodes javalang's tree iteration would yield, without
+    building the (path, node) tuple for each one"""
+    count = 0
+    stack = [root]
+    while stack:
+        item = stack.pop()
+        if isinstance(item, javalang.ast.Node):
+            count += 1
+            item = item.children
+        for child in item:
+            if isinstance(child, (javalang.ast.Node, list, tuple)):
+                stack.append(child)
+    return count
+
 
 class ASTParser:
     def __init__(self):
         self.smell_detector = CodeSmellDetector()
         self.quality_analyzer = CodeQualityAnalyzer()
-        self.complexity_predictor = ComplexityPredictor()
+        # (abspath, st_mtime_ns, st_size) -> analysis of that version of the file
+        self._parse_cache = OrderedDict()
 
-    def parse_file(self, file_path):
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
+    @cached_property
+    def complexity_predictor(self):
+        """Built on first use: importing it pulls in pandas and sklearn, which
+        callers that only need the AST never touch"""
+        from app.ml.ml_complexity_predictor import ComplexityPredictor
+        return ComplexityPredictor()
 
-        _, ext = os.path.splitext(file_path)
+    def parse_file(self, file_path, code=None):
+        """Parse and analyze file_path; pass code to reuse content already read.
+        Without code, an unchanged file returns its previous analysis"""
+        # One stat both checks the file exists and keys the cache
+        try:
+            st = os.stat(file_path)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"File not found: {file_path}") from None
+
+        if code is not None:
+            return self._analyze(file_path, code)
 
-        with open(file_path, "r", encoding="utf-8") as file:
-            code = file.read()
+        key = (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+        result = self._parse_cache.get(key)
+        if result is not None:
+            self._parse_cache.move_to_end(key)
+        else:
+            with open(file_path, "r", encoding="utf-8") as file:
+                code = file.read()
+            result = self._analyze(file_path, code)
+            self._parse_cache[key] = result
+            if len(self._parse_cache) > _PARSE_CACHE_SIZE:
+                self._parse_cache.popitem(last=False)
+        # Callers add keys to the result; keep the cached dict unchanged
+        return dict(result)
+
+    def _analyze(self, file_path, code):
+        """Parse code as the contents of file_path and run every analysis on it"""
+        _, ext = os.path.splitext(file_path)
 
         if ext == ".py":
-            ast_result = self._parse_python_ast(code)
-            smells = self.smell_detector.detect_python_smells(ast_result)
+            # Parsed once here and handed to the smell detector as well
+            tree = ast.parse(code)
+            ast_result = self._parse_python_ast(code, tree)
+            smells = self.smell_detector.detect_python_smells(ast_result, tree=tree)
 
         elif ext == ".java":
             ast_result = self._parse_java_ast(code)
@@ -72,7 +125,7 @@ class ASTParser:
                 smell_summary["by_severity"].get(s.severity, 0) + 1
             )
         # Analyze code quality (works for ALL supported file types)
-        quality_score = self.quality_analyzer.analyze_file(file_path, smell_summary)        # ML Complexity Prediction
+        quality_score = self.quality_analyzer.analyze_file(file_path, smell_summary, content=code)        # ML Complexity Prediction
         ml_prediction = self._predict_complexity(ast_result)
         
         # Combine AST results with smell analysis, quality metrics, and ML prediction
@@ -94,24 +147,16 @@ class ASTParser:
     def _predict_complexity(self, ast_result):
         """Predict code complexity using ML model"""
         try:
-            # Read file content
-            with open(ast_result, "r", encoding="utf-8") as file:
-                code_content = file.read()
-            
-            # Extract features from code
-            features = {
-                "lines_of_code": ast_result.get("lines_of_code", 0),
-                "cyclomatic_complexity": ast_result.get("cyclomatic_complexity", 0),
-                "num_methods": ast_result.get("num_methods", 0),
-                "num_classes": ast_result.get("num_classes", 0),
-            }
-
-            # Make prediction
-            prediction = self.complexity_predictor.predict_complexity(features)
+            # Features come from the source the AST was built from (this used
+            # to try to open() the result dict itself and always failed). The
+            # predictor shares the loaded model process-wide and caches
+            # predictions per distinct source, so re-parsing unchanged code
+            # skips the model entirely
+            result = self.complexity_predictor.predict_from_code(ast_result["_raw_source"])
             
             return {
-                "features": features,
-                "prediction": prediction
+                "features": result["features"],
+                "prediction": result["prediction"]
             }
         except Exception as e:
             return {
@@ -131,37 +176,44 @@ class ASTParser:
     def _compute_cyclomatic_complexity(self, tree):
         complexity = 1
         for node in ast.walk(tree):
-            if isinstance(node, (ast.If, ast.For, ast.While, ast.And, ast.Or, ast.ExceptHandler, ast.With, ast.Try)):
+            if isinstance(node, _DECISION_NODES):
                 complexity += 1
         return complexity
     
 
-    def _parse_python_ast(self, code):
-        tree = ast.parse(code)
-        cc = self._compute_cyclomatic_complexity(tree)
-
-        for node in ast.walk(tree):
-            for child in ast.iter_child_nodes(node):
-                 child.parent = node
+    def _parse_python_ast(self, code, tree=None):
+        if tree is None:
+            tree = ast.parse(code)
 
-        classes = [node.name for node in ast.walk(tree) if isinstance(node, ast.ClassDef)]
-        functions = [node.name for node in ast.walk(tree) if isinstance(node, ast.FunctionDef)]
-        # imports = [node.names[0].name for node in ast.walk(tree) if isinstance(node, ast.Import)]
-        imports = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    imports.append(alias.name)
-            elif isinstance(node, ast.ImportFrom):
+        # One breadth-first walk collects everything; lists keep ast.walk order.
+        # The queue is a plain list appended to while it is iterated, which
+        # visits nodes in the same order as ast.walk without its deque
+        classes, functions, imports, variables = [], [], [], []
+        function_nodes = []
+        loops = ifs = 0
+        cc = 1
+        nodes = [tree]
+        for node in nodes:
+            nodes.extend(iter_child_nodes(node))
+            if isinstance(node, _DECISION_NODES):
+                cc += 1
+            if isinstance(node, ast.Name):
+                variables.append(node.id)
+            elif isinstance(node, ast.If):
+                ifs += 1
+            elif isinstance(node, (ast.For, ast.While)):
+                loops += 1
+            elif isinstance(node, ast.FunctionDef):
+                functions.append(node.name)
+                function_nodes.append(node)
+            elif isinstance(node, ast.ClassDef):
+                classes.append(node.name)
+            elif isinstance(node, (ast.Import, ast.ImportFrom)):
                 for alias in node.names:
                     imports.append(alias.name)
-        variables = [node.id for node in ast.walk(tree) if isinstance(node, ast.Name)]
-        loops = sum(isinstance(n, (ast.For, ast.While)) for n in ast.walk(tree))
-        ifs = sum(isinstance(n, ast.If) for n in ast.walk(tree))
         function_complexities = {}
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                function_complexities[node.name] = self._compute_cyclomatic_complexity(node)
+        for node in function_nodes:
+            function_complexities[node.name] = self._compute_cyclomatic_complexity(node)
 
         return {
             "language": "Python",
@@ -169,7 +221,7 @@ class ASTParser:
             "functions": functions,
             "imports": imports,
             "variables": variables,
-            "total_nodes": len(list(ast.walk(tree))),
+            "total_nodes": len(nodes),
             "num_classes": len(classes),
             "num_methods": len(functions),
             "loops": loops,
@@ -199,12 +251,13 @@ class ASTParser:
         ifs = code.count("if(")
 
         cc = 1 + loops + ifs
-        classes = [cls.name for cls in tree.types if hasattr(cls, 'name')]
-        methods = [method.name for cls in tree.types for method in getattr(cls, 'methods', [])]
-        fields = [field.declarators[0].name for cls in tree.types for field in getattr(cls, 'fields', [])]
-        total_nodes = 0
-        for path, node in tree:
-            total_nodes += 1
+        classes, methods, fields = [], [], []
+        for cls in tree.types:
+            if hasattr(cls, 'name'):
+                classes.append(cls.name)
+            methods.extend(method.name for method in getattr(cls, 'methods', []))
+            fields.extend(field.declarators[0].name for field in getattr(cls, 'fields', []))
+        total_nodes = _count_java_nodes(tree)
         return {
             "language": "Java",
             "classes": classes,
@@ -3,11 +3,18 @@ Code Quality Metrics and Scoring System
 Provides comprehensive code quality analysis and scoring
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from dataclasses import dataclass
 import os
 import re
 
+# Per-line checks, compiled once
+_SINGLE_LETTER_ASSIGN_RE = re.compile(r'\b[a-z]\s*=')
+_TIGHT_OPERATOR_RE = re.compile(r'[a-zA-Z0-9][=+\-*/][a-zA-Z0-9]')
+
+# Substrings counted as branch points by the complexity score
+_COMPLEXITY_INDICATORS = ('if ', 'elif ', 'else:', 'for ', 'while ', '&&', '||', 'and ', 'or ')
+
 @dataclass
 class QualityScore:
     """Represents a code quality score with breakdown"""
@@ -26,16 +33,25 @@ class CodeQualityAnalyzer:
         self.file_path = ""
         self.content = ""
         self.lines = []
+        self.stripped_lines = []
         self.total_lines = 0
+        self.comment_lines = 0
     
-    def analyze_file(self, file_path: str, smell_summary: Dict[str, Any]) -> QualityScore:
-        """Analyze a file and return quality score"""
+    def analyze_file(self, file_path: str, smell_summary: Dict[str, Any],
+                     content: Optional[str] = None) -> QualityScore:
+        """Analyze a file and return quality score; pass content to skip re-reading it"""
         self.file_path = file_path
         
-        with open(file_path, 'r', encoding='utf-8') as file:
-            self.content = file.read()
-            self.lines = self.content.splitlines()
-            self.total_lines = len(self.lines)
+        if content is None:
+            with open(file_path, 'r', encoding='utf-8') as file:
+                content = file.read()
+        self.content = content
+        self.lines = self.content.splitlines()
+        # Stripped once here instead of again in every scoring pass
+        self.stripped_lines = [line.strip() for line in self.lines]
+        self.total_lines = len(self.lines)
+        # One comment/docstring pass shared by the score, issues and recommendations
+        self.comment_lines = self._count_documentation_lines()
         
         # Calculate individual scores
         maintainability_score = self._calculate_maintainability_score(smell_summary)
@@ -116,20 +132,10 @@ class CodeQualityAnalyzer:
         """Calculate complexity score (inverted - lower complexity = higher score)"""
         base_score = 100.0
         
-        # Check cyclomatic complexity indicators
-        complexity_indicators = 0
-        for line in self.lines:
-            line = line.strip()
-            # Count complexity indicators
-            complexity_indicators += line.count('if ')
-            complexity_indicators += line.count('elif ')
-            complexity_indicators += line.count('else:')
-            complexity_indicators += line.count('for ')
-            complexity_indicators += line.count('while ')
-            complexity_indicators += line.count('&&')
-            complexity_indicators += line.count('||')
-            complexity_indicators += line.count('and ')
-            complexity_indicators += line.count('or ')
+        # Check cyclomatic complexity indicators. None contains a newline, so
+        # counting over the joined stripped lines matches counting per line
+        stripped_text = '\n'.join(self.stripped_lines)
+        complexity_indicators = sum(stripped_text.count(indicator) for indicator in _COMPLEXITY_INDICATORS)
         
         # Normalize by file size
         if self.total_lines > 0:
@@ -148,47 +154,8 @@ class CodeQualityAnalyzer:
         if self.total_lines == 0:
             return 0
         
-        comment_lines = 0
-        in_multiline_docstring = False
-        docstring_delimiter = None
-        
-        for line in self.lines:
-            stripped = line.strip()
-            
-            # Handle multi-line docstrings (Python)
-            if not in_multiline_docstring:
-                # Check for start of docstring
-                if '"""' in stripped or "'''" in stripped:
-                    delimiter = '"""' if '"""' in stripped else "'''"
-                    # Count occurrences to determine if it's single-line or multi-line
-                    count = stripped.count(delimiter)
-                    if count == 1:
-                        # Start of multi-line docstring
-                        in_multiline_docstring = True
-                        docstring_delimiter = delimiter
-                        comment_lines += 1
-                    elif count >= 2:
-                        # Single-line docstring (opening and closing on same line)
-                        comment_lines += 1
-                # Check for regular comments
-                elif stripped.startswith('#') or stripped.startswith('//'):
-                    comment_lines += 1
-                # Check for block comments (Java/JS style)
-                elif stripped.startswith('/*'):
-                    comment_lines += 1
-                elif stripped.startswith('*') and not stripped.startswith('*/'):
-                    # Middle of a block comment
-                    comment_lines += 1
-            else:
-                # Inside a multi-line docstring - count all lines
-                comment_lines += 1
-                # Check for end of docstring
-                if docstring_delimiter in stripped:
-                    in_multiline_docstring = False
-                    docstring_delimiter = None
-        
         # Calculate comment ratio
-        comment_ratio = comment_lines / self.total_lines
+        comment_ratio = self.comment_lines / self.total_lines
         
         # Score based on comment ratio (more lenient thresholds)
         if comment_ratio >= 0.20:  # 20% or more comments/docs
@@ -209,16 +176,17 @@ class CodeQualityAnalyzer:
         issues = 0
         indentations = []
         
-        for line in self.lines:
-            if line.strip():  # Skip empty lines
+        for line, stripped in zip(self.lines, self.stripped_lines):
+            if stripped:  # Skip empty lines
                 leading_spaces = len(line) - len(line.lstrip())
                 if leading_spaces > 0:
                     indentations.append(leading_spaces)
         
         if indentations:
             # Check for mixed tabs and spaces
-            has_tabs = any('\t' in line for line in self.lines if line.strip())
-            has_spaces = any(line.startswith(' ') for line in self.lines if line.strip())
+            non_empty = [line for line, stripped in zip(self.lines, self.stripped_lines) if stripped]
+            has_tabs = any('\t' in line for line in non_empty)
+            has_spaces = any(line.startswith(' ') for line in non_empty)
             
             if has_tabs and has_spaces:
                 issues += 1
@@ -236,9 +204,9 @@ class CodeQualityAnalyzer:
         
         # Look for single letter variables (except in loops)
         for i, line in enumerate(self.lines):
-            if '=' in line and not line.strip().startswith('#'):
+            if '=' in line and not self.stripped_lines[i].startswith('#'):
                 # Simple check for single letter variables
-                if re.search(r'\b[a-z]\s*=', line):
+                if _SINGLE_LETTER_ASSIGN_RE.search(line):
                     # Check if it's in a for loop
                     if not any('for ' in prev_line for prev_line in self.lines[max(0, i-2):i+1]):
                         issues += 1
@@ -249,13 +217,13 @@ class CodeQualityAnalyzer:
         """Check for spacing issues"""
         issues = 0
         
-        for line in self.lines:
+        for line, stripped in zip(self.lines, self.stripped_lines):
             # Check for missing spaces around operators
-            if re.search(r'[a-zA-Z0-9][=+\-*/][a-zA-Z0-9]', line):
+            if _TIGHT_OPERATOR_RE.search(line):
                 issues += 1
             
             # Check for multiple consecutive spaces
-            if '  ' in line and not line.strip().startswith('#'):
+            if '  ' in line and not stripped.startswith('#'):
                 issues += 1
         
         return issues
@@ -265,13 +233,12 @@ class CodeQualityAnalyzer:
         max_nesting = 0
         current_nesting = 0
         
-        for line in self.lines:
-            stripped = line.strip()
+        for stripped in self.stripped_lines:
             if stripped and not stripped.startswith('#'):
                 # Count opening braces/brackets
-                current_nesting += line.count('{') + line.count('[') + line.count('(')
+                current_nesting += stripped.count('{') + stripped.count('[') + stripped.count('(')
                 # Count closing braces/brackets
-                current_nesting -= line.count('}') + line.count(']') + line.count(')')
+                current_nesting -= stripped.count('}') + stripped.count(']') + stripped.count(')')
                 
                 # Track maximum nesting
                 max_nesting = max(max_nesting, current_nesting)
@@ -284,9 +251,7 @@ class CodeQualityAnalyzer:
         in_multiline_docstring = False
         docstring_delimiter = None
         
-        for line in self.lines:
-            stripped = line.strip()
-            
+        for stripped in self.stripped_lines:
             # Handle multi-line docstrings (Python)
             if not in_multiline_docstring:
                 if '"""' in stripped or "'''" in stripped:
@@ -298,9 +263,8 @@ class CodeQualityAnalyzer:
                         comment_lines += 1
                     elif count >= 2:
                         comment_lines += 1
-                elif stripped.startswith('#') or stripped.startswith('//'):
-                    comment_lines += 1
-                elif stripped.startswith('/*'):
+                # Line and block comments; '*' alone marks the middle of a block
+                elif stripped.startswith(('#', '//', '/*')):
                     comment_lines += 1
                 elif stripped.startswith('*') and not stripped.startswith('*/'):
                     comment_lines += 1
@@ -341,8 +305,7 @@ class CodeQualityAnalyzer:
             issues.append(f"Moderately large file: {self.total_lines} lines")
         
         # Check comment ratio (including docstrings)
-        comment_lines = self._count_documentation_lines()
-        comment_ratio = comment_lines / self.total_lines if self.total_lines > 0 else 0
+        comment_ratio = self.comment_lines / self.total_lines if self.total_lines > 0 else 0
         
         # Only warn if documentation is very low (less than 2%)
         if comment_ratio < 0.02:
@@ -381,8 +344,7 @@ class CodeQualityAnalyzer:
             recommendations.append("Consider splitting this file into smaller, more focused files")
         
         # Documentation recommendations (using proper counting including docstrings)
-        comment_lines = self._count_documentation_lines()
-        comment_ratio = comment_lines / self.total_lines if self.total_lines > 0 else 0
+        comment_ratio = self.comment_lines / self.total_lines if self.total_lines > 0 else 0
         
         # Only recommend more comments if very low documentation
         if comment_ratio < 0.02:
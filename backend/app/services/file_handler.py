@@ -1,47 +1,376 @@
+import contextlib
+import io
+import json
+import mmap
 import os
+import re
 import shutil
 import sys
-from app.ml.parsing import ASTParser
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+try:
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.completion import PathCompleter
+    from prompt_toolkit.history import FileHistory
+except ImportError:
+    PromptSession = None
+
+# Files at least this big are decoded straight out of a read-only mapping
+_MMAP_THRESHOLD = 1 << 20
+_READ_FLAGS = os.O_RDONLY | getattr(os, 'O_CLOEXEC', 0) | getattr(os, 'O_BINARY', 0)
+# Report separators, built once rather than on every analysis
+SEP50 = "-" * 50
+SEP60 = "-" * 60
+_HISTORY_FILE = os.path.join(os.path.expanduser("~"), ".devease_history")
+# Piped/redirected runs (CI, > file) get a JSON summary instead of the full report
+_TTY = sys.stdout.isatty()
+
+# Parse results for recently analyzed files: one LRU per parser, keyed by
+# (abspath, mtime_ns, size), so results never leak between parsers
+_RESULT_CACHE_SIZE = 32
+_result_caches = weakref.WeakKeyDictionary()
+
+# Result-dict keys checked on every report; interned so the lookups and the
+# membership test against _REPORT_KEYS compare by identity first
+_CODE_SMELLS = sys.intern("code_smells")
+_QUALITY_SCORE = sys.intern("quality_score")
+_ML_COMPLEXITY = sys.intern("ml_complexity")
+# Keys with their own report section, left out of the generic field dump
+_REPORT_KEYS = frozenset({_CODE_SMELLS, _QUALITY_SCORE})
 
 class FileHandler:
-    SUPPORTED_EXTENSIONS = ['.java', '.py']
+    # frozenset: membership is checked for every file the menus touch
+    SUPPORTED_EXTENSIONS = frozenset({'.java', '.py'})
+    SUPPORTED_EXTS_STR = ", ".join(sorted(SUPPORTED_EXTENSIONS))
     
     def __init__(self, storage_folder="project_files"):
         self.storage_folder = storage_folder
+        # Joined once; saves just concatenate a filename onto it ('' stays '')
+        self._storage_prefix = os.path.join(storage_folder, '')
+        self._mmaps = {}
         self._ensure_storage_folder()
+        # Unmaps at exit without keeping the handler itself alive
+        self._finalizer = weakref.finalize(self, _close_mappings, self._mmaps)
 
     def _ensure_storage_folder(self):
         os.makedirs(self.storage_folder, exist_ok=True)
+        self._map_saved_files()
+
+    def _map_saved_files(self):
+        """Map every saved file read-only so later reads skip open/read/close"""
+        try:
+            entries = self.list_saved_files()
+        except OSError:
+            return
+        for entry in entries:
+            try:
+                self._map(entry.path)
+            except OSError:
+                continue
+
+    def _map(self, file_path):
+        """Map file_path read-only and keep it; returns the mapping, or None if empty"""
+        fd = os.open(file_path, _READ_FLAGS)
+        try:
+            st = os.fstat(fd)
+            # Zero-length files can't be mapped; they fall back to read_file's fd path
+            if not st.st_size:
+                return None
+            mm = mmap.mmap(fd, 0, access=mmap.ACCESS_READ)
+        finally:
+            os.close(fd)
+        self._mmaps[os.path.abspath(file_path)] = (mm, _file_identity(st))
+        return mm
+
+    def _unmap(self, file_path):
+        mapped = self._mmaps.pop(os.path.abspath(file_path), None)
+        if mapped is not None:
+            mapped[0].close()
+
+    def close(self):
+        """Release the mappings of saved files"""
+        self._finalizer()
 
     def user_input_file(self):
         file_path = input("Enter the full path of the code file: ").strip()
+        # Extension check is a pure string op, so do it before touching the disk
+        if not _EXT_RE.search(file_path):
+            raise ValueError(f"Unsupported file type: {os.path.splitext(file_path)[1]}")
         if not os.path.exists(file_path):
             raise FileNotFoundError(f"File not found: {file_path}")
-        _, ext = os.path.splitext(file_path)
-        if ext.lower() not in self.SUPPORTED_EXTENSIONS:
-            raise ValueError(f"Unsupported file type: {ext}")
         return file_path
 
+    def _mapped(self, file_path):
+        """Return the mapping of a saved file, refreshing it if the file changed"""
+        mapped = self._mmaps.get(os.path.abspath(file_path))
+        if mapped is None:
+            return None
+        # If the file was rewritten or replaced since (editors save via
+        # rename), the mapping is stale: map the new file in its place
+        mm, identity = mapped
+        if _file_identity(os.stat(file_path)) == identity:
+            return mm
+        self._unmap(file_path)
+        try:
+            return self._map(file_path)
+        except OSError:
+            return None
+
     def read_file(self, file_path):
-        with open(file_path, 'r', encoding='utf-8') as file:
-            return file.read()
+        mm = self._mapped(file_path)
+        if mm is not None:
+            return _decode(mm)
+
+        # Raw fd instead of open(): a whole-file read gains nothing from
+        # BufferedReader, and skipping it saves its isatty/lseek calls
+        fd = os.open(file_path, _READ_FLAGS)
+        try:
+            size = os.fstat(fd).st_size
+            if size >= _MMAP_THRESHOLD:
+                # Decode from the page cache instead of reading a bytes copy first
+                with mmap.mmap(fd, 0, access=mmap.ACCESS_READ) as large:
+                    return _decode(large)
+            data = _read_fd(fd, size)
+        finally:
+            os.close(fd)
+        return _decode(data)
+
+    def read_bytes(self, file_path):
+        """Return the file's bytes as stored, without decoding or newline translation"""
+        mm = self._mapped(file_path)
+        if mm is not None:
+            return mm[:]
+        fd = os.open(file_path, _READ_FLAGS)
+        try:
+            return _read_fd(fd, os.fstat(fd).st_size)
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def decode_source(data):
+        """Decode bytes from read_bytes the same way read_file does"""
+        return _decode(data)
 
-    def save_to_local_folder(self, source_path):
-        filename = os.path.basename(source_path)
-        destination = os.path.join(self.storage_folder, filename)
-        shutil.copy(source_path, destination)
+    def read_many(self, paths):
+        """Read several files concurrently.
+
+        Returns ({path: content}, {path: error}) so one unreadable file
+        doesn't cost the rest. Reads release the GIL, so a small thread
+        pool overlaps the disk latency of each file.
+        """
+        contents, errors = {}, {}
+        if not paths:
+            return contents, errors
+        with ThreadPoolExecutor(max_workers=min(32, len(paths))) as executor:
+            futures = [(path, executor.submit(self.read_file, path)) for path in paths]
+            for path, future in futures:
+                try:
+                    contents[path] = future.result()
+                except (OSError, UnicodeDecodeError) as e:
+                    errors[path] = e
+        return contents, errors
+
+    def save_to_local_folder(self, source_path, content=None):
+        cut = source_path.rfind(os.sep)
+        if os.altsep:
+            cut = max(cut, source_path.rfind(os.altsep))
+        filename = source_path[cut + 1:]
+        destination = self._storage_prefix + filename
+        # Unmap first: the old mapping would go stale, and Windows refuses
+        # to overwrite a file that is still mapped
+        self._unmap(destination)
+        if content is not None:
+            # Caller already read the file, so write it out instead of re-reading.
+            # Pass read_bytes() output to keep the copy byte-identical
+            if isinstance(content, str):
+                content = content.encode('utf-8')
+            with open(destination, 'wb') as file:
+                file.write(content)
+        elif not _copy_range(source_path, destination):
+            # copyfile takes the kernel fast path (sendfile/fcopyfile) and skips
+            # the permission copy that shutil.copy does on top
+            shutil.copyfile(source_path, destination)
+        _forget_results(destination)
+        # Files saved this session are served from a mapping too, like those found at startup
+        try:
+            self._map(destination)
+        except OSError:
+            pass
         print(f"File saved to local folder: {destination}")
         return destination
 
-    def get_saved_path(self, filename):
-        file_path = os.path.join(self.storage_folder, filename)
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"No such file saved: {filename}")
-        return file_path
+    def list_saved_files(self):
+        """Return DirEntry objects for the saved files.
+
+        scandir gives us the name, full path and file type in one pass, so
+        the menu can open a selection directly without another stat.
+        """
+        with os.scandir(self.storage_folder) as entries:
+            return [entry for entry in entries if entry.is_file()]
+
+
+# Case-insensitive "ends in a supported extension" test, generated from
+# SUPPORTED_EXTENSIONS; the lookbehind rejects bare dotfiles like "dir/.py"
+_EXT_RE = re.compile(
+    r'(?<=[^/\\])(?:%s)\Z' % '|'.join(map(re.escape, sorted(FileHandler.SUPPORTED_EXTENSIONS))),
+    re.IGNORECASE,
+)
 
+def _file_identity(st):
+    """Stat fields that change when a file is rewritten or replaced"""
+    return (st.st_ino, st.st_size, st.st_mtime_ns)
 
-def analyze_file(file_path, handler, parser):
+
+def _close_mappings(mmaps):
+    for mm, _ in mmaps.values():
+        mm.close()
+    mmaps.clear()
+
+
+def _copy_range(source_path, destination):
+    """Copy in the kernel with copy_file_range (Linux 4.5+).
+
+    Returns False when the call isn't available or fails, so the caller
+    can fall back to shutil.copyfile.
+    """
+    if not hasattr(os, 'copy_file_range'):
+        return False
+    try:
+        src = os.open(source_path, _READ_FLAGS)
+    except OSError:
+        return False
+    try:
+        remaining = os.fstat(src).st_size
+        if not remaining:
+            # Size 0 may be a pseudo-file whose real length is unknown
+            return False
+        dst = os.open(destination, os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, 'O_CLOEXEC', 0), 0o666)
+        try:
+            # Source files are small, so this is normally a single call
+            while remaining > 0:
+                copied = os.copy_file_range(src, dst, remaining)
+                if not copied:
+                    break
+                remaining -= copied
+        finally:
+            os.close(dst)
+        return True
+    except OSError:
+        return False
+    finally:
+        os.close(src)
+
+def _read_fd(fd, size):
+    """Read size bytes from fd, looping only if a read comes back short"""
+    data = os.read(fd, size)
+    while len(data) < size:
+        chunk = os.read(fd, size - len(data))
+        if not chunk:
+            break
+        data += chunk
+    return data
+
+
+def _decode(data):
+    """Decode UTF-8 source, keeping the universal-newline behaviour of text mode"""
+    content = str(data, 'utf-8')
+    if '\r' in content:
+        content = content.replace('\r\n', '\n').replace('\r', '\n')
+    return content
+
+
+def _result_key(file_path):
+    """Cache key that changes whenever the file is rewritten, or None if it can't be stat'd"""
+    try:
+        st = os.stat(file_path)
+    except OSError:
+        return None
+    return (os.path.abspath(file_path), st.st_mtime_ns, st.st_size)
+
+
+def _forget_results(file_path):
+    """Drop cached results for file_path after it has been overwritten"""
+    abspath = os.path.abspath(file_path)
+    for cache in _result_caches.values():
+        for key in [key for key in cache if key[0] == abspath]:
+            del cache[key]
+
+
+def _print_smell_report(smells):
+    if not smells:
+        print("No code smells detected.")
+        return
+    print(f"Found {len(smells)} code smell(s):")
+    for smell in smells:
+        print(f"  [{smell['severity'].upper()}] Line {smell['line']}: {smell['description']}")
+        print(f"    Suggestion: {smell['suggestion']}")
+
+
+def analyze_file(file_path, handler, parser, content=None, training=None, quiet=False):
     """Complete analysis workflow: File Handler → Parsing → Code Smell Detection"""
+    # The report is dozens of prints; collect them and write once instead
+    # of paying a stdout write per line. quiet drops the report entirely
+    out = io.StringIO()
+    with contextlib.redirect_stdout(out):
+        success = _run_analysis(file_path, handler, parser, content, training)
+    if not quiet:
+        sys.stdout.write(out.getvalue())
+        sys.stdout.flush()
+    return success
+
+
+def _print_results(result, parser, training):
+    """Full human-readable report for one parse result."""
+    # Display AST results
+    print("\nParsing: AST Analysis")
+    print(SEP50)
+    for k, v in result.items():
+        if k not in _REPORT_KEYS:
+            if isinstance(v, list) and len(v) > 10:
+                print(f"{k}: {len(v)} items - {v[:5]}... (showing first 5)")
+            else:
+                print(f"{k}: {v}")
+    
+    # Step 3: Code Smell Detection
+    print("\nCode Smell Detection: Analyzing code quality")
+    print(SEP50)
+    
+    if _CODE_SMELLS in result:
+        # Print from the result, not detector state: on a cache hit the
+        # detector last saw some other file
+        _print_smell_report(result[_CODE_SMELLS])
+    
+    # Step 4: Quality Metrics
+    # print("\nCode Quality Metrics: Overall assessment")
+    # print("-" * 50)
+    
+    if _QUALITY_SCORE in result:
+        parser.quality_analyzer.print_quality_report(result[_QUALITY_SCORE])
+    
+    # Step 5: ML Complexity Prediction
+    # print("\nML Complexity Prediction: AI-powered analysis")
+    print(SEP50)
+    
+    if training is not None and not training.done():
+        print("ML training still running... complexity prediction will be available shortly.")
+    elif _ML_COMPLEXITY in result:
+        ml_data = result[_ML_COMPLEXITY]
+        if "error" not in ml_data:
+            print("Extracted Features:")
+            for feature, value in ml_data["features"].items():
+                print(f"  {feature}: {value}")
+            
+            # print("\nML Prediction Results:")
+            # if "prediction" in ml_data and "error" not in ml_data["prediction"]:
+            #     parser.complexity_predictor.print_prediction_report(ml_data["prediction"])
+            # else:
+            #     print("  No trained model available. Train the model first!")
+        else:
+            print(f"ML Prediction Error: {ml_data['error']}")
+
+def _run_analysis(file_path, handler, parser, content, training):
     try:
         # Step 1: File Handler - Validate and read file
         # print(f"\nFile Handler: Processing {file_path}")
@@ -51,66 +380,43 @@ def analyze_file(file_path, handler, parser):
             print(f"ERROR: File not found: {file_path}")
             return False
         
-        _, ext = os.path.splitext(file_path)
-        if ext.lower() not in handler.SUPPORTED_EXTENSIONS:
-            print(f"ERROR: Unsupported file type: {ext}")
-            print(f"Supported types: {', '.join(handler.SUPPORTED_EXTENSIONS)}")
+        if not _EXT_RE.search(file_path):
+            print(f"ERROR: Unsupported file type: {os.path.splitext(file_path)[1]}")
+            print("Supported types:", handler.SUPPORTED_EXTS_STR)
             return False
         
-        # Read file content
-        content = handler.read_file(file_path)
-        # print(f"SUCCESS: File loaded successfully ({len(content)} characters)")
-        
-        # Step 2: Parsing - AST Analysis
-        # print("\nParsing: AST Analysis")
-        # print("-" * 50)
-        
-        result = parser.parse_file(file_path)
-        
-        # Display AST results
-        print("\nParsing: AST Analysis")
-        print("-" * 50)
-        for k, v in result.items():
-            if k not in ["code_smells", "quality_score"]:
-                if isinstance(v, list) and len(v) > 10:
-                    print(f"{k}: {len(v)} items - {v[:5]}... (showing first 5)")
-                else:
-                    print(f"{k}: {v}")
-        
-        # Step 3: Code Smell Detection
-        print("\nCode Smell Detection: Analyzing code quality")
-        print("-" * 50)
-        
-        if "code_smells" in result:
-            parser.smell_detector.print_smell_report()
-        
-        # Step 4: Quality Metrics
-        # print("\nCode Quality Metrics: Overall assessment")
-        # print("-" * 50)
-        
-        if "quality_score" in result:
-            parser.quality_analyzer.print_quality_report(result["quality_score"])
-        
-        # Step 5: ML Complexity Prediction
-        # print("\nML Complexity Prediction: AI-powered analysis")
-        print("-" * 50)
+        # Re-selecting an unchanged file reuses its last parse
+        key = _result_key(file_path)
+        cache = _result_caches.setdefault(parser, OrderedDict())
+        result = cache.get(key) if key else None
+        if result is not None:
+            cache.move_to_end(key)
+        else:
+            # Read file content (unless the caller already has it)
+            if content is None:
+                content = handler.read_file(file_path)
+            elif isinstance(content, bytes):
+                content = _decode(content)
+            # print(f"SUCCESS: File loaded successfully ({len(content)} characters)")
+
+            # Step 2: Parsing - AST Analysis
+            # print("\nParsing: AST Analysis")
+            # print("-" * 50)
+
+            result = parser.parse_file(file_path, code=content)
+            if key:
+                cache[key] = result
+                if len(cache) > _RESULT_CACHE_SIZE:
+                    cache.popitem(last=False)
         
-        if "ml_complexity" in result:
-            ml_data = result["ml_complexity"]
-            if "error" not in ml_data:
-                print("Extracted Features:")
-                for feature, value in ml_data["features"].items():
-                    print(f"  {feature}: {value}")
-                
-                # print("\nML Prediction Results:")
-                # if "prediction" in ml_data and "error" not in ml_data["prediction"]:
-                #     parser.complexity_predictor.print_prediction_report(ml_data["prediction"])
-                # else:
-                #     print("  No trained model available. Train the model first!")
-            else:
-                print(f"ML Prediction Error: {ml_data['error']}")
+        if not _TTY:
+            json.dump({k: v for k, v in result.items() if k not in _REPORT_KEYS},
+                      sys.stdout, default=str)
+            print()
+        else:
+            _print_results(result, parser, training)
         
-        print("\n" + "-" * 50)
+        print("\n" + SEP50)
         print("SUCCESS: Complete Analysis Finished Successfully!")
 
         
@@ -120,98 +426,230 @@ def analyze_file(file_path, handler, parser):
         print(f"ERROR: Error during analysis: {e}")
         return False
 
-def main():
-    """Main DevEase application with integrated workflow"""
-    print("-" * 60)
-    print("    DevEase - Enhancment developer User experience Tool")
-    print("-" * 60)
-    print()
-    
-    # Initialize components
-    handler = FileHandler()
-    parser = ASTParser()
-    
-    # Auto-train ML model on startup
-    dataset_path = os.path.join(os.path.dirname(__file__), "dataset1.csv")
+# ─────────────────────────────────────────────
+# Multi-file analysis across processes
+# ─────────────────────────────────────────────
 
-    
-    if os.path.exists(dataset_path): 
-        # print(f"Found dataset: {dataset_path}")
-        # print("Training ML model for complexity prediction...")
-        # success = parser.complexity_predictor.train_model(dataset_path, force_retrain=True)
+_worker_parser = None
 
-        parser.complexity_predictor.verify_preprocessing(dataset_path)
-        success = parser.complexity_predictor.train_model(dataset_path, force_retrain=True)
 
-        if success:
-            print("model trained Successfully.")
-        else:
-            print("WARNING: ML model training failed, but system will continue...")
+def _init_worker():
+    """Build one parser per worker process and load the saved model once"""
+    global _worker_parser
+    from app.ml.parsing import ASTParser
+    _worker_parser = ASTParser()
+    _worker_parser.complexity_predictor.load_model()
+
+
+def _parse_in_worker(file_path, content):
+    return _worker_parser.parse_file(file_path, code=content)
+
+
+def analyze_all(handler, parser, contents, training=None, quiet=False):
+    """Analyze {path: content}, parsing files in parallel across cores.
+
+    Each report is printed as soon as its parse finishes. Parse results are
+    seeded into the parser's result cache, so analyze_file only prints them.
+    """
+    if len(contents) < 2:
+        for path, content in contents.items():
+            analyze_file(path, handler, parser, content=content, training=training, quiet=quiet)
+        return
+
+    cache = _result_caches.setdefault(parser, OrderedDict())
+    with ProcessPoolExecutor(initializer=_init_worker) as executor:
+        futures = {
+            executor.submit(_parse_in_worker, path, content): path
+            for path, content in contents.items()
+        }
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"ERROR: Error during analysis of {path}: {e}")
+                continue
+            key = _result_key(path)
+            if key:
+                cache[key] = result
+                if len(cache) > _RESULT_CACHE_SIZE:
+                    cache.popitem(last=False)
+            analyze_file(path, handler, parser, content=contents[path], training=training, quiet=quiet)
+
+
+def _make_prompt():
+    """Return the menu's prompt function.
+
+    With prompt_toolkit on a terminal this gives arrow-key history across
+    runs and tab-completion for paths; otherwise it is plain input().
+    """
+    if PromptSession is None or not sys.stdin.isatty():
+        return lambda message, complete_paths=False: input(message)
+
+    session = PromptSession(history=FileHistory(_HISTORY_FILE))
+    completer = PathCompleter()
+
+    def prompt(message, complete_paths=False):
+        return session.prompt(message, completer=completer if complete_paths else None)
+    return prompt
+
+
+def _train(predictor, dataset_path):
+    predictor.verify_preprocessing(dataset_path)
+    return predictor.train_model(dataset_path, force_retrain=True)
+
+
+def _start_training(predictor, dataset_path):
+    """Train the complexity model on a worker thread and return its future"""
+    executor = ThreadPoolExecutor(max_workers=1)
+    training = executor.submit(_train, predictor, dataset_path)
+    executor.shutdown(wait=False)
+    return training
+
+
+def _report_training(training):
+    """Wait for background training if needed and print its outcome"""
+    try:
+        success = training.result()
+    except Exception as e:
+        print(f"ERROR: ML model training failed: {e}")
+        success = False
+    if success:
+        print("model trained Successfully.")
+    else:
+        print("WARNING: ML model training failed, but system will continue...")
+
+
+def _build_parser():
+    """Import the ML stack, build the parser and start model training.
+
+    Deferred until the first analysis so the menu comes up without waiting
+    on the sklearn/numpy imports, and choosing Exit never pays for them.
+    """
+    from app.ml.parsing import ASTParser
+    parser = ASTParser()
+
+    # Auto-train ML model on first use
+    dataset_path = os.path.join(os.path.dirname(__file__), "dataset1.csv")
+    training = None
+    if os.path.exists(dataset_path):
+        # Train in the background so the first report isn't held up
+        training = _start_training(parser.complexity_predictor, dataset_path)
     else:
         print(f"WARNING: Dataset not found at {dataset_path}")
         print("ML complexity prediction will not be available.")
-    
+    return parser, training
+
+
+def main():
+    """Main DevEase application with integrated workflow"""
+    print(SEP60)
+    print("    DevEase - Enhancment developer User experience Tool")
+    print(SEP60)
     print()
     
+    # Initialize components; the parser is built on first use
+    handler = FileHandler()
+    parser = training = None
+    
+    # -q suppresses analysis reports for scripted/batch runs
+    args = sys.argv[1:]
+    quiet = "-q" in args
+    args = [arg for arg in args if arg != "-q"]
+
     # Check if file path provided as command line argument
-    if len(sys.argv) > 1:
-        file_path = sys.argv[1]
+    if args:
+        file_path = args[0]
         print(f"Command Line Mode: Analyzing {file_path}")
-        analyze_file(file_path, handler, parser)
+        parser, training = _build_parser()
+        # A one-shot run wants the full report, so wait for the model
+        if training is not None:
+            _report_training(training)
+        analyze_file(file_path, handler, parser, quiet=quiet)
         return
     
 
     # Interactive mode
+    prompt = _make_prompt()
     while True:
-        print("-" * 50)
+        if training is not None and training.done():
+            _report_training(training)
+            training = None
+
+        print(SEP50)
         print("\n Welcome to DevEase ")
         print("1. Upload a new file")
         print("2. Choose a saved file")
-        print("3. Exit")
+        print("3. Analyze all saved files")
+        print("4. Exit")
         
         try:
-            choice = input("\nEnter choice: ").strip()
+            choice = prompt("\nEnter choice: ").strip()
             
             if choice == "1":
-                file_path = input("Enter the full path of the code file: ").strip()
+                file_path = prompt("Enter the full path of the code file: ", complete_paths=True).strip()
                 if file_path:
-                    analyze_file(file_path, handler, parser)
+                    # Read once: the same bytes feed the analysis and the saved copy
+                    data = None
+                    if _EXT_RE.search(file_path) and os.path.isfile(file_path):
+                        data = handler.read_bytes(file_path)
+                    if parser is None:
+                        parser, training = _build_parser()
+                    analyze_file(file_path, handler, parser, content=data, training=training, quiet=quiet)
                     
                     # Ask if user wants to save the file
-                    save = input("\nSave this file locally? (y/n): ").lower()
+                    save = prompt("\nSave this file locally? (y/n): ").lower()
                     if save == 'y':
-                        handler.save_to_local_folder(file_path)
+                        handler.save_to_local_folder(file_path, content=data)
                         print("SUCCESS: File saved successfully!")
                 else:
                     print("ERROR: No file path provided!")
             
             elif choice == "2":
-                files = os.listdir(handler.storage_folder)
-                if not files:
+                entries = handler.list_saved_files()
+                if not entries:
                     print("\nERROR: No saved files found!")
                     continue
                 
                 print("\nSaved files:")
-                for i, file in enumerate(files, 1):
-                    print(f"{i}. {file}")
+                for i, entry in enumerate(entries, 1):
+                    print(f"{i}. {entry.name}")
                 
                 try:
-                    idx = int(input("\nChoose file number: ")) - 1
-                    if 0 <= idx < len(files):
-                        selected_file = files[idx]
-                        file_path = handler.get_saved_path(selected_file)
-                        analyze_file(file_path, handler, parser)
+                    idx = int(prompt("\nChoose file number: ")) - 1
+                    if 0 <= idx < len(entries):
+                        if parser is None:
+                            parser, training = _build_parser()
+                        analyze_file(entries[idx].path, handler, parser, training=training, quiet=quiet)
                     else:
                         print("ERROR: Invalid file number!")
                 except ValueError:
                     print("ERROR: Please enter a valid number!")
             
             elif choice == "3":
+                entries = handler.list_saved_files()
+                if not entries:
+                    print("\nERROR: No saved files found!")
+                    continue
+
+                # Only read what analyze_file would accept
+                paths = [
+                    entry.path for entry in entries
+                    if _EXT_RE.search(entry.name)
+                ]
+                contents, errors = handler.read_many(paths)
+                for path, error in errors.items():
+                    print(f"ERROR: Could not read {path}: {error}")
+                if parser is None:
+                    parser, training = _build_parser()
+                analyze_all(handler, parser, contents, training=training, quiet=quiet)
+
+            elif choice == "4":
                 print("\nSUCCESS: Exit System Successfully.")
                 break
             
             else:
-                print("ERROR: Invalid choice! Please enter 1, 2, or 3.")
+                print("ERROR: Invalid choice! Please enter 1, 2, 3, or 4.")
         
         except KeyboardInterrupt:
             print("\n\nSUCCESS: Exit System Successfully.")
@@ -1,9 +1,11 @@
+import json
+import mmap
 import os
 import pytest
 from unittest.mock import patch, mock_open, MagicMock
 
 # Import the module components to test
-from app.services.file_handler import FileHandler, analyze_file
+from app.services.file_handler import FileHandler, analyze_all, analyze_file, _result_caches
 
 class TestFileHandler:
     
@@ -49,19 +51,31 @@ class TestFileHandler:
             
         assert "Unsupported file type" in str(exc_info.value)
 
-    @patch('os.makedirs')
-    def test_read_file(self, mock_makedirs):
-        """Test reading file content."""
-        handler = FileHandler()
-        mock_file_content = "print('Hello, DevEase!')"
-        
-        with patch('builtins.open', mock_open(read_data=mock_file_content)) as mocked_file:
-            content = handler.read_file("dummy_path.py")
-            
-            mocked_file.assert_called_once_with("dummy_path.py", 'r', encoding='utf-8')
-            assert content == mock_file_content
+    def test_read_file(self, tmp_path):
+        """Test reading file content with newlines normalised."""
+        source = tmp_path / "dummy_path.py"
+        source.write_bytes(b"print('Hello, DevEase!')\r\nprint('bye')\r")
+        handler = FileHandler(storage_folder=str(tmp_path))
+
+        content = handler.read_file(str(source))
 
-    @patch('shutil.copy')
+        assert content == "print('Hello, DevEase!')\nprint('bye')\n"
+
+    def test_read_file_large_uses_mmap(self, tmp_path):
+        """Test files over the mmap threshold are decoded from a mapping."""
+        source = tmp_path / "big.py"
+        source.write_text("x = 'é'\n" * 10, encoding='utf-8')
+        # Keep the source outside storage so it isn't already mapped at startup
+        handler = FileHandler(storage_folder=str(tmp_path / "store"))
+
+        with patch('app.services.file_handler._MMAP_THRESHOLD', 1), \
+                patch('mmap.mmap', wraps=mmap.mmap) as mocked_mmap:
+            content = handler.read_file(str(source))
+
+        mocked_mmap.assert_called_once()
+        assert content == "x = 'é'\n" * 10
+
+    @patch('shutil.copyfile')
     @patch('os.makedirs')
     def test_save_to_local_folder(self, mock_makedirs, mock_copy):
         """Test saving a file to the local storage folder."""
@@ -74,35 +88,124 @@ class TestFileHandler:
         mock_copy.assert_called_once_with(source_path, expected_destination)
         assert result == expected_destination
 
-    @patch('os.path.exists', return_value=True)
-    @patch('os.makedirs')
-    def test_get_saved_path_exists(self, mock_makedirs, mock_exists):
-        """Test retrieving a valid saved file path."""
-        handler = FileHandler(storage_folder="test_project_files")
-        result = handler.get_saved_path("script.py")
-        
-        expected_path = os.path.join("test_project_files", "script.py")
-        assert result == expected_path
+    @patch('shutil.copyfile')
+    def test_save_to_local_folder_with_content(self, mock_copy, tmp_path):
+        """Test saving already-read content writes it without copying the source."""
+        handler = FileHandler(storage_folder=str(tmp_path))
 
-    @patch('os.path.exists', return_value=False)
-    @patch('os.makedirs')
-    def test_get_saved_path_not_exists(self, mock_makedirs, mock_exists):
-        """Test FileNotFoundError is raised when retrieving a non-existent saved file."""
-        handler = FileHandler()
-        
-        with pytest.raises(FileNotFoundError) as exc_info:
-            handler.get_saved_path("missing.py")
-            
-        assert "No such file saved" in str(exc_info.value)
+        result = handler.save_to_local_folder("/path/to/source/script.py", content="print('hi')\n")
+
+        mock_copy.assert_not_called()
+        assert result == os.path.join(str(tmp_path), "script.py")
+        assert (tmp_path / "script.py").read_bytes() == b"print('hi')\n"
+
+    @pytest.mark.skipif(not hasattr(os, 'copy_file_range'), reason="copy_file_range is Linux-only")
+    @patch('shutil.copyfile')
+    def test_save_to_local_folder_copies_in_kernel(self, mock_copy, tmp_path):
+        """Test a plain save copies through copy_file_range when the platform has it."""
+        source = tmp_path / "script.py"
+        source.write_bytes(b"print('hi')\r\n")
+        handler = FileHandler(storage_folder=str(tmp_path / "store"))
+
+        result = handler.save_to_local_folder(str(source))
+
+        mock_copy.assert_not_called()
+        with open(result, 'rb') as saved:
+            assert saved.read() == b"print('hi')\r\n"
+
+    def test_list_saved_files(self, tmp_path):
+        """Test listing saved files skips sub-directories and returns full paths."""
+        (tmp_path / "script.py").write_text("print('hi')")
+        (tmp_path / "nested").mkdir()
+        handler = FileHandler(storage_folder=str(tmp_path))
+
+        entries = handler.list_saved_files()
+
+        assert [e.name for e in entries] == ["script.py"]
+        assert entries[0].path == os.path.join(str(tmp_path), "script.py")
+
+    def test_save_read_bytes_keeps_source_bytes(self, tmp_path):
+        """Test saving read_bytes output copies CRLF sources byte for byte."""
+        source = tmp_path / "crlf.py"
+        source.write_bytes(b"x = 1\r\ny = 2\r\n")
+        handler = FileHandler(storage_folder=str(tmp_path / "store"))
+
+        data = handler.read_bytes(str(source))
+        saved = handler.save_to_local_folder(str(source), content=data)
+
+        assert saved == os.path.join(str(tmp_path / "store"), "crlf.py")
+        assert (tmp_path / "store" / "crlf.py").read_bytes() == b"x = 1\r\ny = 2\r\n"
+        assert handler.decode_source(data) == "x = 1\ny = 2\n"
+
+    def test_saved_files_are_mapped_at_startup(self, tmp_path):
+        """Test saved files are served from their mapping until they change."""
+        (tmp_path / "saved.py").write_text("x = 1\n")
+        (tmp_path / "empty.py").write_text("")
+        handler = FileHandler(storage_folder=str(tmp_path))
+        saved = str(tmp_path / "saved.py")
+
+        assert list(handler._mmaps) == [os.path.abspath(saved)]
+        with patch('os.open') as mocked_open:
+            assert handler.read_file(saved) == "x = 1\n"
+        mocked_open.assert_not_called()
+        assert handler.read_file(str(tmp_path / "empty.py")) == ""
+
+        # Same-size atomic replace, as editors do on save
+        (tmp_path / "new.tmp").write_text("y = 2\n")
+        os.replace(tmp_path / "new.tmp", saved)
+        assert handler.read_file(saved) == "y = 2\n"
+        with patch('os.open') as mocked_open:
+            assert handler.read_file(saved) == "y = 2\n"
+        mocked_open.assert_not_called()
+        handler.close()
+        assert handler._mmaps == {}
+
+    def test_saved_file_is_mapped(self, tmp_path):
+        """Test a file saved during the session is read back from a mapping."""
+        source = tmp_path / "script.py"
+        source.write_text("x = 1\n")
+        handler = FileHandler(storage_folder=str(tmp_path / "store"))
+
+        saved = handler.save_to_local_folder(str(source))
+
+        with patch('os.open') as mocked_open:
+            assert handler.read_file(saved) == "x = 1\n"
+        mocked_open.assert_not_called()
+        handler.close()
+
+    def test_read_many(self, tmp_path):
+        """Test reading several files keys content by path and collects errors per file."""
+        paths = []
+        for name in ("a.py", "b.py", "c.java"):
+            (tmp_path / name).write_text(f"// {name}")
+            paths.append(str(tmp_path / name))
+        handler = FileHandler(storage_folder=str(tmp_path))
+
+        (tmp_path / "bad.py").write_bytes(b"\xff\xfe\x00")
+        paths.insert(1, str(tmp_path / "bad.py"))
+
+        contents, errors = handler.read_many(paths)
+
+        assert list(contents) == [paths[0], paths[2], paths[3]]
+        assert contents[paths[3]] == "// c.java"
+        assert isinstance(errors[paths[1]], UnicodeDecodeError)
 
 
 class TestAnalyzeFile:
 
+    @pytest.fixture(autouse=True)
+    def clear_result_cache(self):
+        """Pytest fixture so cached parse results never leak between tests."""
+        _result_caches.clear()
+        yield
+        _result_caches.clear()
+
     @pytest.fixture
     def mock_dependencies(self):
         """Pytest fixture to provide mock handler and parser for analysis tests."""
         handler = MagicMock()
         handler.SUPPORTED_EXTENSIONS = ['.java', '.py']
+        handler.SUPPORTED_EXTS_STR = '.java, .py'
         parser = MagicMock()
         return handler, parser
 
@@ -141,4 +244,107 @@ class TestAnalyzeFile:
         
         assert result is True
         handler.read_file.assert_called_once_with("valid_file.py")
-        parser.parse_file.assert_called_once_with("valid_file.py")
\ No newline at end of file
+        parser.parse_file.assert_called_once_with("valid_file.py", code="print('test')")
+
+    @patch('os.path.exists', return_value=True)
+    def test_analyze_file_reuses_given_content(self, mock_exists, mock_dependencies):
+        """Test content read up front (e.g. by read_many) is not read again."""
+        handler, parser = mock_dependencies
+        parser.parse_file.return_value = {}
+
+        result = analyze_file("valid_file.py", handler, parser, content="print('test')")
+
+        assert result is True
+        handler.read_file.assert_not_called()
+        parser.parse_file.assert_called_once_with("valid_file.py", code="print('test')")
+
+    def test_analyze_file_reuses_result_until_file_changes(self, tmp_path, mock_dependencies):
+        """Test re-analyzing an unchanged file skips the parse, and edits invalidate it."""
+        handler, parser = mock_dependencies
+        parser.parse_file.return_value = {}
+        source = tmp_path / "cached.py"
+        source.write_text("x = 1\n")
+
+        assert analyze_file(str(source), handler, parser) is True
+        assert analyze_file(str(source), handler, parser) is True
+        assert parser.parse_file.call_count == 1
+
+        source.write_text("x = 1\ny = 2\n")
+        assert analyze_file(str(source), handler, parser) is True
+        assert parser.parse_file.call_count == 2
+
+    @patch('app.services.file_handler._TTY', True)
+    def test_analyze_file_cache_is_per_parser(self, tmp_path, mock_dependencies, capsys):
+        """Test a second parser re-parses, and smells print from the result itself."""
+        handler, parser = mock_dependencies
+        other_parser = MagicMock()
+        source = tmp_path / "cached.py"
+        source.write_text("x = 1\n")
+        smell = {"type": "magic_number", "severity": "low", "description": "Magic number '42' found",
+                 "line": 1, "suggestion": "Use a constant"}
+        parser.parse_file.return_value = {"code_smells": [smell]}
+        other_parser.parse_file.return_value = {"code_smells": []}
+
+        assert analyze_file(str(source), handler, parser) is True
+        assert analyze_file(str(source), handler, other_parser) is True
+
+        other_parser.parse_file.assert_called_once()
+        assert "Magic number '42' found" in capsys.readouterr().out
+
+    @patch('app.services.file_handler._TTY', True)
+    @patch('os.path.exists', return_value=True)
+    def test_analyze_file_while_training(self, mock_exists, mock_dependencies, capsys):
+        """Test analysis doesn't wait on background training and says it's still running."""
+        handler, parser = mock_dependencies
+        parser.parse_file.return_value = {"ml_complexity": {"error": "model not ready"}}
+        training = MagicMock()
+        training.done.return_value = False
+
+        assert analyze_file("valid_file.py", handler, parser, training=training) is True
+
+        training.result.assert_not_called()
+        out = capsys.readouterr().out
+        assert "ML training still running" in out
+        assert "ML Prediction Error" not in out
+
+    @patch('app.services.file_handler._TTY', False)
+    @patch('os.path.exists', return_value=True)
+    def test_analyze_file_non_tty_prints_json_summary(self, mock_exists, mock_dependencies, capsys):
+        """Test piped output is a JSON summary instead of the formatted report."""
+        handler, parser = mock_dependencies
+        parser.parse_file.return_value = {"functions": ["f"], "code_smells": [], "quality_score": 95}
+
+        assert analyze_file("valid_file.py", handler, parser, content="def f(): pass") is True
+
+        summary = capsys.readouterr().out.splitlines()[0]
+        assert json.loads(summary) == {"functions": ["f"]}
+        parser.quality_analyzer.print_quality_report.assert_not_called()
+
+    @patch('os.path.exists', return_value=True)
+    def test_analyze_file_quiet(self, mock_exists, mock_dependencies, capsys):
+        """Test quiet mode runs the analysis without writing the report."""
+        handler, parser = mock_dependencies
+        parser.parse_file.return_value = {"code_smells": []}
+
+        assert analyze_file("valid_file.py", handler, parser, quiet=True) is True
+
+        parser.parse_file.assert_called_once()
+        assert capsys.readouterr().out == ""
+
+    def test_analyze_all_parses_in_workers(self, tmp_path, capsys):
+        """Test every file is reported once while parsing happens in worker processes."""
+        from app.ml.parsing import ASTParser
+        paths = []
+        for name in ("smelly_code.py", "SmellyClass.java"):
+            with open(os.path.join("test_files", name), encoding="utf-8") as f:
+                (tmp_path / name).write_text(f.read(), encoding="utf-8")
+            paths.append(str(tmp_path / name))
+        handler = FileHandler(storage_folder=str(tmp_path))
+        parser = ASTParser()
+
+        with patch.object(parser, "parse_file") as local_parse:
+            analyze_all(handler, parser, handler.read_many(paths)[0])
+
+        local_parse.assert_not_called()
+        assert capsys.readouterr().out.count("Complete Analysis Finished Successfully") == 2
+        handler.close()
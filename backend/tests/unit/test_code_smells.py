@@ -1,4 +1,5 @@
 import os
+from unittest.mock import patch
 
 from app.ml.code_smell_detector import CodeSmellDetector
 
@@ -80,4 +81,31 @@ def test_java_specific_smells():
 
     # Check Java-specific smells
     assert summary["by_type"].get("long_parameter_list", 0) > 0
-    assert summary["by_type"].get("println_in_domain", 0) > 0
\ No newline at end of file
+    assert summary["by_type"].get("println_in_domain", 0) > 0
+
+def test_repeated_detection_is_cached():
+    detector = CodeSmellDetector()
+
+    file_path = os.path.join("test_files", "smelly_code.py")
+    content = load_file(file_path)
+
+    first = detector.detect_python_smells({"_raw_source": content})
+    with patch.object(detector, "_detect_long_functions") as long_functions:
+        second = detector.detect_python_smells({"_raw_source": content})
+
+    long_functions.assert_not_called()
+    assert second == first
+    assert second is not first
+
+
+def test_detect_smells_dispatches_on_language():
+    detector = CodeSmellDetector()
+
+    file_path = os.path.join("test_files", "smelly_code.py")
+    content = load_file(file_path)
+
+    smells = detector.detect_smells({"language": "Python", "_raw_source": content})
+
+    assert smells == CodeSmellDetector().detect_python_smells({"_raw_source": content})
+    assert detector.detect_smells({"language": "Unknown", "_raw_source": content}) == []
+
@@ -1,4 +1,5 @@
 import os
+from unittest.mock import patch
 from app.ml.ml_complexity_predictor import ComplexityPredictor
 
 #Test case 1 - Model Loads Correctly
@@ -104,4 +105,76 @@ def f(n):
 
     features = predictor.extract_features_from_code(code)
 
-    assert features["recursion_present"] in [0, 1]
\ No newline at end of file
+    assert features["recursion_present"] in [0, 1]
+
+#Test case 8 — Counts are per line, and loop depth follows braces
+def test_feature_counts_per_line():
+    predictor = ComplexityPredictor()
+
+    code = """
+for (int i = 0; i < n; i++) { if (a) { if (b) break; } }
+    for (int j = 0; j < n; j++) {
+        while (x) { break; }
+    }
+}
+elif_count(); platform(); sorted(xs); resort(ys)
+"""
+
+    features = predictor.extract_features_from_code(code)
+
+    assert features["no_of_ifs"] == 1
+    assert features["no_of_loop"] == 3
+    assert features["no_of_break"] == 2
+    assert features["no_of_sort"] == 1
+    assert features["nested_loop_depth"] == 3
+
+#Test case 9 — Repeated code is scored from the cache
+def test_predict_from_code_caches_by_content():
+    predictor = ComplexityPredictor()
+    predictor.load_model()
+    code = "for i in range(n):\n    if i: break\n"
+
+    first = predictor.predict_from_code(code)
+    with patch.object(predictor, "extract_features_from_code") as extract:
+        second = predictor.predict_from_code(code)
+
+    extract.assert_not_called()
+    assert second == first
+    assert first["prediction"]["predicted_complexity"] in ["1", "logn", "n", "n_square", "nlogn"]
+
+#Test case 10 — Scale-free models skip StandardScaler at prediction time
+def test_prediction_skips_scaler_for_tree_models():
+    predictor = ComplexityPredictor()
+    predictor.load_model()
+    predictor._scaled = False
+
+    with patch.object(predictor.scaler, "transform") as transform:
+        result = predictor.predict_complexity({"no_of_loop": 2, "nested_loop_depth": 2})
+
+    transform.assert_not_called()
+    assert "predicted_complexity" in result
+
+#Test case 11 — Batch prediction matches one-at-a-time prediction
+def test_predict_many_matches_single_predictions():
+    predictor = ComplexityPredictor()
+    predictor.load_model()
+    rows = [{"no_of_loop": 1}, {"no_of_loop": 2, "nested_loop_depth": 2}, {"no_of_ifs": 3, "no_of_sort": 1}]
+
+    batch = predictor.predict_many(rows)
+
+    assert [r["predicted_complexity"] for r in batch] == \
+        [predictor.predict_complexity(row)["predicted_complexity"] for row in rows]
+    assert predictor.predict_many([]) == []
+
+#Test case 12 — The model file is loaded once per process
+def test_model_file_shared_between_predictors():
+    first = ComplexityPredictor()
+    assert first.load_model() is True
+
+    second = ComplexityPredictor()
+    with patch("app.ml.ml_complexity_predictor.joblib.load") as load:
+        assert second.load_model() is True
+
+    load.assert_not_called()
+    assert second.model is first.model
+    assert second.imputer is not first.imputer
@@ -31,4 +31,49 @@ def test_invalid_java():
     code = "public class Test { public void x( }"
     result = parser._parse_java_ast(code)
 
-    assert "error" in result
\ No newline at end of file
+    assert "error" in result
+def test_quality_analysis_reuses_parsed_source():
+    from app.services.code_quality_metrics import CodeQualityAnalyzer
+
+    # No file on disk: the analyzer must work from the content it is given
+    score = CodeQualityAnalyzer().analyze_file("not_on_disk.py", {}, content="x = 1\n")
+
+    assert 0 <= score.overall_score <= 100
+
+def test_parse_file_predicts_complexity():
+    parser = ASTParser()
+
+    result = parser.parse_file(os.path.join("test_files", "testfilepy.py"))
+
+    assert "error" not in result["ml_complexity"]
+    assert "no_of_loop" in result["ml_complexity"]["features"]
+    assert "predicted_complexity" in result["ml_complexity"]["prediction"]
+
+def test_parse_file_reuses_analysis_until_file_changes(tmp_path):
+    from unittest.mock import patch
+
+    parser = ASTParser()
+    source = tmp_path / "module.py"
+    source.write_text("def f():\n    return 1\n")
+
+    first = parser.parse_file(str(source))
+    first["language"] = "changed by caller"
+    with patch.object(parser, "_analyze") as analyze:
+        second = parser.parse_file(str(source))
+    analyze.assert_not_called()
+    assert second["language"] == "Python"
+
+    source.write_text("def f():\n    return 1\n\ndef g():\n    return 2\n")
+    assert parser.parse_file(str(source))["num_methods"] == 2
+
+def test_python_source_is_parsed_once(tmp_path):
+    import ast
+    from unittest.mock import patch
+
+    source = tmp_path / "module.py"
+    source.write_text("def f():\n    return 1\n")
+
+    with patch("ast.parse", wraps=ast.parse) as parse:
+        ASTParser().parse_file(str(source))
+
+    assert parse.call_count == 1